@@ -0,0 +1,183 @@
+import argparse
+import csv
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from MemoryEngine import TECHNIQUES, STRATEGIES, STRATEGY_TECHNIQUES, MemorySimulator
+from Workload import GeneratedWorkload, generate_workload, replay
+
+WORKLOADS = ["churn", "growing", "adversarial", "buddy_worst_case"]
+RESULT_FIELDS = ["workload", "technique", "strategy", "blocks", "total_memory", "events", "failed_allocations",
+                 "ops_per_second", "calibration", "peak_rss", "internal_fragmentation", "external_fragmentation_index"]
+# Request sizes are uniform up to MAX_SIZE; heaps get some headroom over the expected live bytes
+MAX_SIZE = 256
+HEADROOM = 1.25
+# Sizes just past a power of two waste almost half of every buddy block
+BUDDY_WORST_SIZES = [17, 33, 65, 129, 257]
+
+def workload_events(workload, blocks, seed=None):
+    # Events and heap size for a workload that keeps about `blocks` processes live
+    if workload == "churn":
+        # Steady state: one allocation per tick, each living `blocks` ticks on average
+        events = generate_workload(2 * blocks, seed, max_size=MAX_SIZE, mean_lifetime=blocks)
+        return events, int(blocks * MAX_SIZE / 2 * HEADROOM)
+    elif workload == "growing":
+        # Lifetimes far beyond the trace, so the heap only grows until it is full
+        events = generate_workload(blocks, seed, max_size=MAX_SIZE, mean_lifetime=10 * blocks)
+        return events, int(blocks * MAX_SIZE / 2 * HEADROOM)
+    elif workload == "adversarial":
+        # Fill memory with small blocks, free every other one, then ask for blocks no hole can hold
+        small = MAX_SIZE // 4
+        pids = np.arange(1, blocks + 1, dtype=np.int64)
+        large_pids = np.arange(blocks + 1, blocks + blocks // 2 + 1, dtype=np.int64)
+        kinds = np.concatenate([np.zeros(blocks, np.int8), np.ones(len(pids[1::2]), np.int8),
+                                np.zeros(len(large_pids), np.int8)])
+        all_pids = np.concatenate([pids, pids[1::2], large_pids])
+        sizes = np.concatenate([np.full(blocks, small), np.zeros(len(pids[1::2]), np.int64),
+                                np.full(len(large_pids), 2 * small + 1)])
+        return GeneratedWorkload(kinds, all_pids, sizes), int(blocks * small * HEADROOM)
+    elif workload == "buddy_worst_case":
+        events = generate_workload(2 * blocks, seed, max_size=MAX_SIZE, mean_lifetime=blocks)
+        rng = np.random.default_rng(seed)
+        events.sizes = np.where(events.kinds == 0, rng.choice(BUDDY_WORST_SIZES, len(events)), 0)
+        return events, int(blocks * np.mean(BUDDY_WORST_SIZES) * HEADROOM)
+    raise ValueError(f"Unknown benchmark workload: {workload}")
+
+def benchmark_cases(workloads, techniques, strategies, sizes):
+    # Every technique with every strategy it offers, as in the GUI menus
+    cases = []
+    for workload in workloads:
+        for blocks in sizes:
+            for technique in techniques:
+                for strategy in (strategies if technique in STRATEGY_TECHNIQUES else ["First Fit"]):
+                    cases.append({"workload": workload, "technique": technique, "strategy": strategy,
+                                  "blocks": blocks})
+    return cases
+
+def case_key(case):
+    return f"{case['workload']}/{case['technique']}/{case['strategy']}/{case['blocks']}"
+
+def peak_rss():
+    # Peak resident set size of this process in bytes, or None where the platform cannot tell
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def calibrate(loops=100000):
+    # Speed of a fixed interpreter loop, in loops per second. Throughput is compared relative to it,
+    # so a baseline recorded on a faster or busier machine still applies.
+    table = {}
+    started = time.perf_counter()
+    for i in range(loops):
+        table[i & 1023] = table.get(i & 1023, 0) + i
+    return loops / (time.perf_counter() - started)
+
+def run_case(case, seed=0, repeat=3, min_time=0.2):
+    # Median of at least `repeat` runs, repeated until min_time seconds have been measured, since a
+    # short run is mostly timer and scheduler noise. Each run is calibrated just before it starts.
+    runs = []
+    measured = 0.0
+    while len(runs) < repeat or measured < min_time:
+        events, total_memory = workload_events(case["workload"], case["blocks"], seed)
+        simulator = MemorySimulator(case["technique"], total_memory, case["strategy"], seed)
+        calibration = calibrate()
+        summary = replay(events, simulator)
+        summary["calibration"] = calibration
+        runs.append(summary)
+        measured += summary["elapsed"]
+    runs.sort(key=lambda run: run["events_per_second"] / run["calibration"])
+    median = runs[len(runs) // 2]
+    result = dict(case)
+    result.update({"total_memory": total_memory, "events": median["events"],
+                   "failed_allocations": median["failed_allocations"], "ops_per_second": median["events_per_second"],
+                   "calibration": median["calibration"],
+                   "peak_rss": peak_rss(), "internal_fragmentation": median["internal_fragmentation"],
+                   "external_fragmentation_index": median["external_fragmentation_index"]})
+    return result
+
+def run_isolated(case, seed=0, repeat=3, min_time=0.2):
+    # A fresh process per case, so peak RSS belongs to that case alone
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(run_case, case, seed, repeat, min_time).result()
+
+def compare(results, baseline, tolerance=0.25, fragmentation_tolerance=0.01, failure_tolerance=0.01):
+    # Regressions against a baseline: slower or larger by more than tolerance, more fragmented inside or
+    # between blocks, or failing a larger share of events
+    regressions = []
+    for result in results:
+        key = case_key(result)
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        speed = result["ops_per_second"] / result["calibration"]
+        reference_speed = reference["ops_per_second"] / reference["calibration"]
+        if speed < reference_speed * (1 - tolerance):
+            regressions.append(f"{key}: {result['ops_per_second']:.0f} ops/sec, baseline "
+                               f"{reference['ops_per_second']:.0f} ({speed / reference_speed - 1:+.0%} after calibration)")
+        if result["peak_rss"] and reference.get("peak_rss") and result["peak_rss"] > reference["peak_rss"] * (1 + tolerance):
+            regressions.append(f"{key}: peak RSS {result['peak_rss']}, baseline {reference['peak_rss']}")
+        fragmentation = result["external_fragmentation_index"]
+        if fragmentation > reference["external_fragmentation_index"] + fragmentation_tolerance:
+            regressions.append(f"{key}: fragmentation index {fragmentation:.3f}, "
+                               f"baseline {reference['external_fragmentation_index']:.3f}")
+        # Internal fragmentation as a share of the heap, so it compares across heap sizes
+        internal = result["internal_fragmentation"] / result["total_memory"]
+        reference_internal = reference["internal_fragmentation"] / reference["total_memory"]
+        if internal > reference_internal + fragmentation_tolerance:
+            regressions.append(f"{key}: internal fragmentation {internal:.3f} of memory, "
+                               f"baseline {reference_internal:.3f}")
+        failures = result["failed_allocations"] / result["events"] if result["events"] else 0.0
+        reference_failures = reference["failed_allocations"] / reference["events"] if reference["events"] else 0.0
+        if failures > reference_failures + failure_tolerance:
+            regressions.append(f"{key}: failed allocations {failures:.3f} of events, baseline {reference_failures:.3f}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every technique and strategy against a stored baseline.")
+    parser.add_argument("--workloads", nargs="+", default=WORKLOADS, choices=WORKLOADS)
+    parser.add_argument("--techniques", nargs="+", default=TECHNIQUES, choices=TECHNIQUES)
+    parser.add_argument("--strategies", nargs="+", default=STRATEGIES, choices=STRATEGIES)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000],
+                        help="live blocks per heap; up to 10000000 for a full run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="take the median of at least N runs per case")
+    parser.add_argument("--min-time", type=float, default=0.2, help="keep repeating a case until this many seconds")
+    parser.add_argument("--baseline", help="JSON baseline to compare against")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown or RSS growth")
+    parser.add_argument("--fragmentation-tolerance", type=float, default=0.01,
+                        help="allowed rise in the external fragmentation index and in internal fragmentation "
+                             "as a share of memory")
+    parser.add_argument("--failure-tolerance", type=float, default=0.01,
+                        help="allowed rise in failed allocations as a share of events")
+    args = parser.parse_args(argv)
+
+    writer = csv.DictWriter(sys.stdout, fieldnames=RESULT_FIELDS)
+    writer.writeheader()
+    results = []
+    for case in benchmark_cases(args.workloads, args.techniques, args.strategies, args.sizes):
+        results.append(run_isolated(case, args.seed, args.repeat, args.min_time))
+        writer.writerow(results[-1])
+        sys.stdout.flush()
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as baseline_file:
+            json.dump({case_key(result): result for result in results}, baseline_file, indent=1)
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance, args.fragmentation_tolerance,
+                                  args.failure_tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+import argparse
+import csv
+import itertools
+import random
+import sys
+import threading
+import time
+from MemoryEngine import STRATEGIES, Process, create_engine, memory_stats
+from Workload import SIZE_DISTRIBUTIONS, generate_workload, read_trace
+
+# Engines that can back an arena, and how arenas are locked
+ARENA_TECHNIQUES = ["Dynamic Allocation", "Buddy System"]
+LOCKING_MODES = ["global", "per-arena"]
+RESULT_FIELDS = ["technique", "strategy", "arenas", "workers", "locking", "events", "allocations",
+                 "failed_allocations", "pool_allocations", "stranded_failures", "frees", "remote_frees",
+                 "deferred_frees", "elapsed", "events_per_second", "lock_acquisitions", "lock_contentions", "lock_wait", "free_memory",
+                 "largest_free_block", "free_block_count", "external_fragmentation_index",
+                 "cross_arena_fragmentation"]
+
+class TimedLock:
+    # A mutex that records how often and how long callers waited for it
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.acquisitions = 0
+        self.contentions = 0
+        self.wait_ns = 0
+
+    def __enter__(self):
+        if not self.lock.acquire(blocking=False):
+            begin = time.perf_counter_ns()
+            self.lock.acquire()
+            # Counters are only touched while the lock is held
+            self.wait_ns += time.perf_counter_ns() - begin
+            self.contentions += 1
+        self.acquisitions += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self.lock.release()
+
+class ArenaAllocator:
+    # Memory is split into one arena per group of threads plus a shared global pool that serves
+    # requests an arena cannot. Each arena and the pool is an independent engine.
+    def __init__(self, technique, total_memory, arenas=4, strategy="First Fit", locking="per-arena",
+                 pool_fraction=0.25, **options):
+        if technique not in ARENA_TECHNIQUES:
+            raise ValueError(f"Arenas need one of {', '.join(ARENA_TECHNIQUES)}, not {technique}.")
+        if locking not in LOCKING_MODES:
+            raise ValueError(f"Unknown locking mode: {locking}")
+        if arenas <= 0 or not 0 <= pool_fraction < 1:
+            raise ValueError("Need at least one arena and a pool fraction in [0, 1).")
+        self.technique = technique
+        self.strategy = strategy
+        self.total_memory = total_memory
+        self.locking = locking
+        pool_memory = int(total_memory * pool_fraction)
+        arena_memory = (total_memory - pool_memory) // arenas
+        self.arenas = [create_engine(technique, arena_memory, **options) for _ in range(arenas)]
+        self.pool = create_engine(technique, pool_memory, **options) if pool_memory else None
+        if locking == "global":
+            self.pool_lock = TimedLock()
+            self.arena_locks = [self.pool_lock] * arenas
+        else:
+            self.pool_lock = TimedLock()
+            self.arena_locks = [TimedLock() for _ in range(arenas)]
+        # Owner heap of every live process, an arena index or -1 for the pool, and the arena it was asked of
+        self.owners = {}
+        self.pids = itertools.count(1)
+        # Guards the counters below, which are not tied to any one heap
+        self.counters_lock = threading.Lock()
+        self.pool_allocations = 0
+        self.stranded_failures = 0
+        self.remote_frees = 0
+
+    def heaps(self):
+        return self.arenas + ([self.pool] if self.pool is not None else [])
+
+    def allocate(self, arena_index, size):
+        # Returns the new process id, or None when neither the arena nor the pool has room
+        arena_index %= len(self.arenas)
+        new_process = Process(next(self.pids), size)
+        with self.arena_locks[arena_index]:
+            if self.arenas[arena_index].allocate(new_process, self.strategy):
+                self.owners[new_process.pid] = (arena_index, arena_index)
+                return new_process.pid
+        if self.pool is not None:
+            with self.pool_lock:
+                if self.pool.allocate(new_process, self.strategy):
+                    self.owners[new_process.pid] = (-1, arena_index)
+                    self.pool_allocations += 1
+                    return new_process.pid
+        # Fragmentation across arenas: another arena could have served the request
+        for lock, engine in zip(self.arena_locks, self.arenas):
+            with lock:
+                stranded = engine.stats()["largest_free_block"] >= size
+            if stranded:
+                with self.counters_lock:
+                    self.stranded_failures += 1
+                break
+        return None
+
+    def free(self, process_id, arena_index=None):
+        placement = self.owners.pop(process_id, None)
+        if placement is None:
+            return False
+        owner, requested_arena = placement
+        if owner == -1:
+            with self.pool_lock:
+                freed = self.pool.free(process_id)
+        else:
+            with self.arena_locks[owner]:
+                freed = self.arenas[owner].free(process_id)
+        if arena_index is not None and arena_index % len(self.arenas) != requested_arena:
+            # Freed by a thread that allocates from a different arena
+            with self.counters_lock:
+                self.remote_frees += 1
+        return freed
+
+    def lock_stats(self):
+        locks = {id(lock): lock for lock in self.arena_locks + [self.pool_lock]}.values()
+        return {"lock_acquisitions": sum(lock.acquisitions for lock in locks),
+                "lock_contentions": sum(lock.contentions for lock in locks),
+                "lock_wait": sum(lock.wait_ns for lock in locks) / 1e9}
+
+    def stats(self):
+        heap_stats = [engine.stats() for engine in self.heaps()]
+        free_memory = sum(stats["free_memory"] for stats in heap_stats)
+        stats = memory_stats(self.total_memory, sum(stats["used_memory"] for stats in heap_stats),
+                             sum(stats["internal_fragmentation"] for stats in heap_stats), free_memory,
+                             max(stats["largest_free_block"] for stats in heap_stats),
+                             sum(stats["free_block_count"] for stats in heap_stats))
+        # Share of free memory outside the heap holding the most of it, whatever its holes look like
+        stats["cross_arena_fragmentation"] = (1 - max(stats["free_memory"] for stats in heap_stats) / free_memory
+                                              if free_memory else 0.0)
+        stats["pool_allocations"] = self.pool_allocations
+        stats["stranded_failures"] = self.stranded_failures
+        stats["remote_frees"] = self.remote_frees
+        stats.update(self.lock_stats())
+        return stats
+
+def split_trace(events, workers, remote_fraction=0.0, seed=None):
+    # Deal a single trace out to worker threads by pid. Each process is allocated by one worker and,
+    # unless remote_fraction of frees are handed to another worker, freed by the same one. Processes
+    # are renumbered by the trace position of their allocation, so a pid the trace reuses is still a
+    # different process, and every free also carries its own trace position.
+    rng = random.Random(seed)
+    traces = [[] for _ in range(workers)]
+    live = {}
+    for position, event in enumerate(events):
+        if event[0] == "alloc":
+            worker = event[1] % workers
+            live[event[1]] = (position, worker)
+            traces[worker].append(("alloc", position, event[2]))
+        elif event[0] == "free" and event[1] in live:
+            number, worker = live.pop(event[1])
+            if workers > 1 and rng.random() < remote_fraction:
+                worker = (worker + rng.randrange(1, workers)) % workers
+            traces[worker].append(("free", number, position))
+    return traces
+
+def event_position(event):
+    return event[1] if event[0] == "alloc" else event[2]
+
+def replay_worker(allocator, worker, events, handles, barrier, sync_every, rounds, counts):
+    # Workers move through the trace in rounds of sync_every positions and wait for each other at the
+    # end of every round. handles maps trace processes to allocator pids, or None where allocation
+    # failed; a free whose allocation another worker has not reached yet is deferred to the round's end.
+    deferred = []
+    allocations = failed_allocations = frees = deferred_frees = 0
+
+    def free(number):
+        nonlocal frees
+        pid = handles.pop(number)
+        if pid is not None and allocator.free(pid, worker):
+            frees += 1
+
+    i = 0
+    for round_number in range(rounds):
+        round_end = (round_number + 1) * sync_every
+        while i < len(events) and event_position(events[i]) < round_end:
+            event = events[i]
+            i += 1
+            if event[0] == "alloc":
+                pid = allocator.allocate(worker, event[2])
+                handles[event[1]] = pid
+                if pid is None:
+                    failed_allocations += 1
+                else:
+                    allocations += 1
+            elif event[1] in handles:
+                free(event[1])
+            else:
+                deferred.append(event[1])
+                deferred_frees += 1
+        barrier.wait()
+        # Every allocation up to the end of the round has happened now
+        for number in deferred:
+            free(number)
+        deferred.clear()
+    counts[worker] = (len(events), allocations, failed_allocations, frees, deferred_frees)
+
+def run_workers(allocator, traces, sync_every=1000):
+    # One thread per trace, worker i allocating from arena i modulo the arena count.
+    # Python threads interleave under the GIL, so throughput reflects locking overhead and
+    # contention rather than parallel speedup.
+    counts = [None] * len(traces)
+    handles = {}
+    trace_length = max((event_position(events[-1]) + 1 for events in traces if events), default=0)
+    rounds = -(-trace_length // sync_every)
+    barrier = threading.Barrier(len(traces))
+    threads = [threading.Thread(target=replay_worker,
+                                args=(allocator, worker, events, handles, barrier, sync_every, rounds, counts))
+               for worker, events in enumerate(traces)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    events, allocations, failed_allocations, frees, deferred_frees = (sum(column) for column in zip(*counts))
+    summary = {"technique": allocator.technique, "strategy": allocator.strategy, "arenas": len(allocator.arenas),
+               "workers": len(traces), "locking": allocator.locking, "events": events, "allocations": allocations,
+               "failed_allocations": failed_allocations, "frees": frees, "deferred_frees": deferred_frees,
+               "elapsed": elapsed, "events_per_second": events / elapsed if elapsed else 0.0}
+    summary.update(allocator.stats())
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a trace from several threads through per-thread arenas.")
+    parser.add_argument("trace", nargs="?", help="CSV or JSONL trace; a synthetic one is generated if omitted")
+    parser.add_argument("--technique", default="Dynamic Allocation", choices=ARENA_TECHNIQUES)
+    parser.add_argument("--strategy", default="First Fit", choices=STRATEGIES)
+    parser.add_argument("--memory", type=int, required=True, help="total memory size, shared by arenas and pool")
+    parser.add_argument("--arenas", nargs="+", type=int, default=[1, 2, 4, 8], help="arena counts to compare")
+    parser.add_argument("--locking", nargs="+", default=LOCKING_MODES, choices=LOCKING_MODES)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--pool-fraction", type=float, default=0.25, help="share of memory kept in the global pool")
+    parser.add_argument("--remote-frees", type=float, default=0.0,
+                        help="share of frees handed to a worker other than the allocating one")
+    parser.add_argument("--sync-every", type=int, default=1000,
+                        help="trace events per round; workers wait for each other between rounds")
+    parser.add_argument("--allocations", type=int, default=100000, help="size of the generated trace")
+    parser.add_argument("--size-distribution", default="uniform", choices=SIZE_DISTRIBUTIONS)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        events = list(read_trace(args.trace))
+    else:
+        events = list(generate_workload(args.allocations, args.seed, args.size_distribution))
+    traces = split_trace(events, args.workers, args.remote_frees, args.seed)
+    writer = csv.DictWriter(sys.stdout, fieldnames=RESULT_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for arenas, locking in itertools.product(args.arenas, args.locking):
+        allocator = ArenaAllocator(args.technique, args.memory, arenas, args.strategy, locking, args.pool_fraction)
+        writer.writerow(run_workers(allocator, traces, args.sync_every))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import csv
+import time
+
+# Engine methods that get timed when instrumentation is attached
+OPERATIONS = ["allocate", "free", "compact", "merge_free_blocks", "merge_block", "split_block"]
+LATENCY_BUCKETS = 64
+SAMPLE_FIELDS = ["free_memory", "largest_free_block", "free_block_count", "internal_fragmentation",
+                 "external_fragmentation_index"]
+
+class Instrumentation:
+    # Wraps the hot paths of one engine instance; an engine without it attached runs untouched code
+    def __init__(self, sample_every=1000):
+        self.sample_every = sample_every
+        self.engine = None
+        self.calls = {}
+        self.total_ns = {}
+        # Latency histograms with power-of-two nanosecond buckets
+        self.histograms = {}
+        self.scan_counts = [0] * LATENCY_BUCKETS
+        self.blocks_scanned = 0
+        self.failed_allocations = 0
+        self.operations = 0
+        self.samples = []
+        self.started = None
+        self.splits_at_attach = 0
+        self.merges_at_attach = 0
+
+    def attach(self, engine):
+        if self.engine is not None:
+            raise ValueError("Instrumentation is already attached to an engine.")
+        self.engine = engine
+        self.started = time.perf_counter()
+        self.splits_at_attach = getattr(engine, "splits", 0)
+        self.merges_at_attach = getattr(engine, "merges", 0)
+        for name in OPERATIONS:
+            method = getattr(engine, name, None)
+            if method is not None:
+                self.calls.setdefault(name, 0)
+                self.total_ns.setdefault(name, 0)
+                self.histograms.setdefault(name, [0] * LATENCY_BUCKETS)
+                setattr(engine, name, self.timed(name, method))
+        return engine
+
+    def detach(self):
+        if self.engine is None:
+            return
+        for name in OPERATIONS:
+            self.engine.__dict__.pop(name, None)
+        self.engine = None
+
+    def timed(self, name, method):
+        histogram = self.histograms[name]
+        clock = time.perf_counter_ns
+        counted = name in ("allocate", "free")
+
+        def timed_method(*args, **kwargs):
+            begin = clock()
+            result = method(*args, **kwargs)
+            elapsed = clock() - begin
+            self.calls[name] += 1
+            self.total_ns[name] += elapsed
+            histogram[min(elapsed.bit_length(), LATENCY_BUCKETS - 1)] += 1
+            if name == "allocate":
+                scanned = getattr(self.engine, "last_scanned", 0)
+                self.blocks_scanned += scanned
+                self.scan_counts[min(scanned.bit_length(), LATENCY_BUCKETS - 1)] += 1
+                if not result:
+                    self.failed_allocations += 1
+            if counted:
+                self.operations += 1
+                if self.sample_every and self.operations % self.sample_every == 0:
+                    self.sample()
+            return result
+
+        return timed_method
+
+    def sample(self):
+        stats = self.engine.stats()
+        row = {"operation": self.operations, "elapsed": time.perf_counter() - self.started}
+        for field in SAMPLE_FIELDS:
+            row[field] = stats[field]
+        self.samples.append(row)
+
+    def summary(self):
+        rows = []
+        for name, calls in self.calls.items():
+            rows.append({
+                "operation": name,
+                "calls": calls,
+                "total_ns": self.total_ns[name],
+                "mean_ns": self.total_ns[name] / calls if calls else 0.0,
+                "p50_ns": self.percentile(name, 0.5),
+                "p99_ns": self.percentile(name, 0.99),
+            })
+        return rows
+
+    def counters(self):
+        allocations = self.calls.get("allocate", 0)
+        return {
+            "allocations": allocations,
+            "failed_allocations": self.failed_allocations,
+            "blocks_scanned": self.blocks_scanned,
+            "mean_blocks_scanned": self.blocks_scanned / allocations if allocations else 0.0,
+            "splits": getattr(self.engine, "splits", 0) - self.splits_at_attach,
+            "merges": getattr(self.engine, "merges", 0) - self.merges_at_attach,
+        }
+
+    def percentile(self, name, fraction):
+        # Upper bound of the histogram bucket holding the requested percentile
+        histogram = self.histograms[name]
+        target = fraction * sum(histogram)
+        seen = 0
+        for bucket, count in enumerate(histogram):
+            seen += count
+            if count and seen >= target:
+                return (1 << bucket) - 1
+        return 0
+
+    def histogram_rows(self):
+        histograms = {f"{name}_ns": histogram for name, histogram in self.histograms.items()}
+        histograms["blocks_scanned"] = self.scan_counts
+        rows = []
+        for metric, histogram in histograms.items():
+            for bucket, count in enumerate(histogram):
+                if count:
+                    rows.append({"metric": metric, "low": (1 << bucket) >> 1, "high": (1 << bucket) - 1, "count": count})
+        return rows
+
+    def tables(self):
+        return {"operations": self.summary(), "counters": [self.counters()], "histogram": self.histogram_rows(),
+                "timeseries": self.samples}
+
+    def export_csv(self, prefix):
+        # One file per table: <prefix>_operations.csv, _counters.csv, _histogram.csv and _timeseries.csv
+        paths = []
+        for table, rows in self.tables().items():
+            if not rows:
+                continue
+            path = f"{prefix}_{table}.csv"
+            with open(path, "w", newline="") as table_file:
+                writer = csv.DictWriter(table_file, fieldnames=list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
+            paths.append(path)
+        return paths
+
+    def export_parquet(self, prefix):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export needs pyarrow; use export_csv instead.")
+        paths = []
+        for table, rows in self.tables().items():
+            if not rows:
+                continue
+            path = f"{prefix}_{table}.parquet"
+            pq.write_table(pa.Table.from_pylist(rows), path)
+            paths.append(path)
+        return paths
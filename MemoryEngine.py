@@ -0,0 +1,1309 @@
+import bisect
+import random
+import math
+from array import array
+import numpy as np
+from Paging import FrameTable, PageTable, TLB, DemandPager
+
+TECHNIQUES = ["Fixed-sized Partitioning", "Unequal-sized Partitioning", "Dynamic Allocation", "Buddy System", "Paging", "Slab Allocation"]
+STRATEGIES = ["First Fit", "Best Fit", "Worst Fit", "Next Fit", "TLSF"]
+# Techniques whose placement depends on the allocation strategy
+STRATEGY_TECHNIQUES = ["Fixed-sized Partitioning", "Unequal-sized Partitioning", "Dynamic Allocation"]
+# Object sizes served by the slab allocator; larger requests take whole slabs
+DEFAULT_SIZE_CLASSES = [16, 32, 64, 128, 256, 512, 1024]
+
+class Process:
+    __slots__ = ("pid", "size")
+
+    def __init__(self, pid, size):
+        self.pid = pid
+        self.size = size
+
+# Blocks use __slots__ so a heap of millions of them carries no per-instance __dict__
+class MemoryBlock:
+    __slots__ = ("start", "size", "free", "process")
+
+    def __init__(self, start, size):
+        self.start = start
+        self.size = size
+        self.free = True
+        self.process = None
+
+class BuddyMemoryBlock:
+    __slots__ = ("start", "size", "free", "process")
+
+    def __init__(self, start, size):
+        self.start = start
+        self.size = size
+        self.free = True
+        self.process = None
+
+def block_columns(blocks):
+    # Struct-of-arrays view of address-ordered blocks; free blocks have pid -1 and process size 0
+    columns = {"start": array('q'), "size": array('q'), "pid": array('q'), "process_size": array('q')}
+    for block in blocks:
+        columns["start"].append(block.start)
+        columns["size"].append(block.size)
+        columns["pid"].append(-1 if block.free else block.process.pid)
+        columns["process_size"].append(0 if block.free else block.process.size)
+    return columns
+
+class CompactionResult:
+    def __init__(self, blocks_moved=0, bytes_moved=0, estimated_time=0.0, largest_free_block=0, complete=True):
+        self.blocks_moved = blocks_moved
+        self.bytes_moved = bytes_moved
+        # Seconds the copy would take at the engine's copy bandwidth
+        self.estimated_time = estimated_time
+        self.largest_free_block = largest_free_block
+        self.complete = complete
+
+    def __bool__(self):
+        return self.blocks_moved > 0
+
+def memory_stats(total_memory, used_memory, internal_fragmentation, free_memory, largest_free_block, free_block_count):
+    return {
+        "total_memory": total_memory,
+        "used_memory": used_memory,
+        "free_memory": free_memory,
+        "internal_fragmentation": internal_fragmentation,
+        "external_fragmentation": free_memory,
+        "largest_free_block": largest_free_block,
+        "free_block_count": free_block_count,
+        # Share of free memory that cannot serve a request as large as the largest hole
+        "external_fragmentation_index": 1 - largest_free_block / free_memory if free_memory else 0.0,
+    }
+
+def fixed_size_partitions(total_memory, num_partitions=10):
+    block_size = int(total_memory / num_partitions)
+    return [block_size] * num_partitions
+
+def unequal_size_partitions(total_memory, num_partitions=10, rng=random):
+    # Generate random cut points and sort them
+    cut_points = sorted(rng.sample(range(1, total_memory), num_partitions - 1))
+
+    # Calculate partition sizes based on cut points
+    return [cut_points[0]] + [cut_points[i] - cut_points[i-1] for i in range(1, len(cut_points))] + [total_memory - cut_points[-1]]
+
+class PartitionedMemory:
+    def __init__(self, partition_sizes, total_memory=None):
+        self.memory_blocks = []
+        self.blocks = {}
+        self.free_sizes = []
+        self.tlsf_index = TLSFIndex()
+        self.process_blocks = {}
+        # Index of the partition Next Fit looks at first
+        self.next_fit_index = 0
+        start = 0
+        for size in partition_sizes:
+            self.memory_blocks.append(MemoryBlock(start, size))
+            self.blocks[start] = self.memory_blocks[-1]
+            self.free_sizes.append((size, start))
+            self.tlsf_index.add(start, size)
+            start += size
+        self.free_sizes.sort()
+        self.total_memory = start if total_memory is None else total_memory
+        self.free_memory = start
+        self.used_memory = 0
+        self.internal_fragmentation = 0
+        self.last_scanned = 0
+
+    def allocate(self, new_process, strategy="First Fit"):
+        self.last_scanned = len(self.memory_blocks)
+        if strategy == "First Fit":
+            for scanned, block in enumerate(self.memory_blocks, 1):
+                if block.free and block.size >= new_process.size:
+                    self.last_scanned = scanned
+                    self.place_process(block, new_process)
+                    return True
+        elif strategy == "Best Fit":
+            best_block = None
+            for block in self.memory_blocks:
+                if block.free and block.size >= new_process.size:
+                    if best_block is None or block.size < best_block.size:
+                        best_block = block
+            if best_block:
+                self.place_process(best_block, new_process)
+                return True
+        elif strategy == "Worst Fit":
+            worst_block = None
+            for block in self.memory_blocks:
+                if block.free and block.size >= new_process.size:
+                    if worst_block is None or block.size > worst_block.size:
+                        worst_block = block
+            if worst_block:
+                self.place_process(worst_block, new_process)
+                return True
+        elif strategy == "Next Fit":
+            count = len(self.memory_blocks)
+            for scanned in range(1, count + 1):
+                i = (self.next_fit_index + scanned - 1) % count
+                block = self.memory_blocks[i]
+                if block.free and block.size >= new_process.size:
+                    self.last_scanned = scanned
+                    self.next_fit_index = (i + 1) % count
+                    self.place_process(block, new_process)
+                    return True
+        elif strategy == "TLSF":
+            self.last_scanned = 1
+            start = self.tlsf_index.find(new_process.size)
+            if start is not None:
+                self.place_process(self.blocks[start], new_process)
+                return True
+        else:
+            raise ValueError(f"Unknown allocation strategy: {strategy}")
+        return False
+
+    def place_process(self, block, new_process):
+        block.process = new_process
+        block.free = False
+        self.process_blocks[new_process.pid] = block
+        del self.free_sizes[bisect.bisect_left(self.free_sizes, (block.size, block.start))]
+        self.tlsf_index.remove(block.start, block.size)
+        self.free_memory -= block.size
+        self.used_memory += new_process.size
+        self.internal_fragmentation += block.size - new_process.size
+
+    def free(self, process_id):
+        block = self.process_blocks.pop(process_id, None)
+        if block is None:
+            return False
+        self.used_memory -= block.process.size
+        self.internal_fragmentation -= block.size - block.process.size
+        self.free_memory += block.size
+        bisect.insort(self.free_sizes, (block.size, block.start))
+        self.tlsf_index.add(block.start, block.size)
+        block.free = True
+        block.process = None
+        return True
+
+    def compact(self):
+        # Partition boundaries are fixed, so there is nothing to move
+        return False
+
+    def block_columns(self):
+        return block_columns(self.memory_blocks)
+
+    def stats(self):
+        largest_free_block = self.free_sizes[-1][0] if self.free_sizes else 0
+        return memory_stats(self.total_memory, self.used_memory, self.internal_fragmentation, self.free_memory,
+                            largest_free_block, len(self.free_sizes))
+
+class FreeBlockIndex:
+    # Address-ordered free holes, kept in chunks that remember their largest hole
+    # so First Fit can skip whole chunks and lookups stay O(log n)
+    chunk_size = 256
+
+    def __init__(self):
+        self.starts = []
+        self.sizes = []
+        self.firsts = []
+        self.maxes = []
+        self.count = 0
+        # Holes and chunk summaries examined by the last first_fit call
+        self.scanned = 0
+
+    @classmethod
+    def from_holes(cls, holes):
+        # Bulk-build from (start, size) pairs already in address order
+        index = cls()
+        for begin in range(0, len(holes), cls.chunk_size):
+            chunk = holes[begin:begin + cls.chunk_size]
+            index.starts.append([start for start, size in chunk])
+            index.sizes.append([size for start, size in chunk])
+            index.firsts.append(chunk[0][0])
+            index.maxes.append(max(size for start, size in chunk))
+        index.count = len(holes)
+        return index
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for chunk_starts, chunk_sizes in zip(self.starts, self.sizes):
+            yield from zip(chunk_starts, chunk_sizes)
+
+    def locate(self, start):
+        return max(bisect.bisect_right(self.firsts, start) - 1, 0)
+
+    def add(self, start, size):
+        if not self.starts:
+            self.starts.append([start])
+            self.sizes.append([size])
+            self.firsts.append(start)
+            self.maxes.append(size)
+            self.count = 1
+            return
+        k = self.locate(start)
+        chunk_starts = self.starts[k]
+        i = bisect.bisect_left(chunk_starts, start)
+        chunk_starts.insert(i, start)
+        self.sizes[k].insert(i, size)
+        self.firsts[k] = chunk_starts[0]
+        if size > self.maxes[k]:
+            self.maxes[k] = size
+        self.count += 1
+        if len(chunk_starts) > 2 * self.chunk_size:
+            # Split an overgrown chunk in half
+            half = len(chunk_starts) // 2
+            upper_starts, upper_sizes = chunk_starts[half:], self.sizes[k][half:]
+            del chunk_starts[half:], self.sizes[k][half:]
+            self.starts.insert(k + 1, upper_starts)
+            self.sizes.insert(k + 1, upper_sizes)
+            self.firsts.insert(k + 1, upper_starts[0])
+            self.maxes.insert(k + 1, max(upper_sizes))
+            self.maxes[k] = max(self.sizes[k])
+
+    def remove(self, start):
+        k = self.locate(start)
+        chunk_starts = self.starts[k]
+        i = bisect.bisect_left(chunk_starts, start)
+        del chunk_starts[i]
+        size = self.sizes[k].pop(i)
+        self.count -= 1
+        if not chunk_starts:
+            del self.starts[k], self.sizes[k], self.firsts[k], self.maxes[k]
+            return
+        self.firsts[k] = chunk_starts[0]
+        if size == self.maxes[k]:
+            self.maxes[k] = max(self.sizes[k])
+
+    def size_at(self, start):
+        if not self.starts:
+            return None
+        k = self.locate(start)
+        chunk_starts = self.starts[k]
+        i = bisect.bisect_left(chunk_starts, start)
+        if i < len(chunk_starts) and chunk_starts[i] == start:
+            return self.sizes[k][i]
+        return None
+
+    def previous(self, start):
+        # Free hole with the highest address below start
+        if not self.starts:
+            return None
+        k = self.locate(start)
+        i = bisect.bisect_left(self.starts[k], start)
+        if i > 0:
+            return self.starts[k][i - 1], self.sizes[k][i - 1]
+        if k > 0:
+            return self.starts[k - 1][-1], self.sizes[k - 1][-1]
+        return None
+
+    def first_fit(self, size, from_start=0):
+        # Lowest-addressed hole at or after from_start that can hold size
+        self.scanned = 0
+        if not self.starts:
+            return None
+        k = self.locate(from_start)
+        chunk_starts, chunk_sizes = self.starts[k], self.sizes[k]
+        if self.maxes[k] >= size:
+            first = bisect.bisect_left(chunk_starts, from_start)
+            for i in range(first, len(chunk_starts)):
+                if chunk_sizes[i] >= size:
+                    self.scanned = i - first + 1
+                    return chunk_starts[i]
+            self.scanned = len(chunk_starts) - first
+        for k in range(k + 1, len(self.maxes)):
+            self.scanned += 1
+            if self.maxes[k] >= size:
+                chunk_sizes = self.sizes[k]
+                for i in range(len(chunk_sizes)):
+                    if chunk_sizes[i] >= size:
+                        self.scanned += i + 1
+                        return self.starts[k][i]
+        return None
+
+class TLSFIndex:
+    # Two-Level Segregated Fit: holes are binned by power of two, then each power of two is split
+    # into 2**SECOND_LEVEL_BITS linear bins. Bitmaps of non-empty bins give a constant-time lookup.
+    # Each bin is an insertion-ordered dict used as a free list, so the hole handed out is well defined.
+    SECOND_LEVEL_BITS = 4
+    SECOND_LEVEL_COUNT = 1 << SECOND_LEVEL_BITS
+
+    def __init__(self):
+        self.first_level_bitmap = 0
+        self.second_level_bitmaps = {}
+        self.bins = {}
+
+    @classmethod
+    def from_holes(cls, holes):
+        index = cls()
+        for start, size in holes:
+            index.add(start, size)
+        return index
+
+    def mapping(self, size):
+        # Sizes below SECOND_LEVEL_COUNT get one exact bin each in first level 0
+        if size < self.SECOND_LEVEL_COUNT:
+            return 0, size
+        first_level = size.bit_length() - self.SECOND_LEVEL_BITS
+        return first_level, (size >> (first_level - 1)) - self.SECOND_LEVEL_COUNT
+
+    def add(self, start, size):
+        first_level, second_level = self.mapping(size)
+        key = (first_level, second_level)
+        if key not in self.bins:
+            self.bins[key] = {}
+            self.second_level_bitmaps[first_level] = self.second_level_bitmaps.get(first_level, 0) | 1 << second_level
+            self.first_level_bitmap |= 1 << first_level
+        self.bins[key][start] = None
+
+    def remove(self, start, size):
+        first_level, second_level = self.mapping(size)
+        key = (first_level, second_level)
+        holes = self.bins[key]
+        del holes[start]
+        if not holes:
+            del self.bins[key]
+            bitmap = self.second_level_bitmaps[first_level] & ~(1 << second_level)
+            self.second_level_bitmaps[first_level] = bitmap
+            if not bitmap:
+                self.first_level_bitmap &= ~(1 << first_level)
+
+    def find(self, size):
+        # Round the request up to the next bin boundary so every hole in the chosen bin fits it
+        if size >= self.SECOND_LEVEL_COUNT:
+            size += (1 << (size.bit_length() - 1 - self.SECOND_LEVEL_BITS)) - 1
+        first_level, second_level = self.mapping(size)
+        bitmap = self.second_level_bitmaps.get(first_level, 0) & (-1 << second_level)
+        if not bitmap:
+            first_levels = self.first_level_bitmap & (-1 << (first_level + 1))
+            if not first_levels:
+                return None
+            first_level = (first_levels & -first_levels).bit_length() - 1
+            bitmap = self.second_level_bitmaps[first_level]
+        second_level = (bitmap & -bitmap).bit_length() - 1
+        # Every hole in the bin fits; like a TLSF free list, take the one added last
+        return next(reversed(self.bins[(first_level, second_level)]))
+
+class DeferredSizes:
+    # Changes to a sorted (size, start) list held back during a batch, so the list is rewritten once
+    # instead of shifted on every split and merge. Lookups see the list minus removed holes plus added ones.
+    def __init__(self, free_sizes):
+        self.free_sizes = free_sizes
+        self.removed = set()
+        self.added = []
+        # Skip pointers past removed entries, searching up and down the list
+        self.skip_up = {}
+        self.skip_down = {}
+
+    def add(self, size, start):
+        bisect.insort(self.added, (size, start))
+
+    def remove(self, size, start):
+        key = (size, start)
+        i = bisect.bisect_left(self.added, key)
+        if i < len(self.added) and self.added[i] == key:
+            del self.added[i]
+        else:
+            self.removed.add(key)
+
+    def live(self, i, step, skips):
+        # Nearest entry from i in direction step that has not been removed
+        free_sizes, removed = self.free_sizes, self.removed
+        path = []
+        while 0 <= i < len(free_sizes) and free_sizes[i] in removed:
+            path.append(i)
+            i = skips.get(i, i + step)
+        for j in path:
+            skips[j] = i
+        return i
+
+    def smallest_at_least(self, size):
+        # Smallest (size, start) hole that can hold size, as Best Fit picks it
+        free_sizes, added = self.free_sizes, self.added
+        key = (size, -1)
+        i = bisect.bisect_left(free_sizes, key)
+        if i < len(free_sizes) and free_sizes[i] in self.removed:
+            i = self.live(i, 1, self.skip_up)
+        hole = free_sizes[i] if i < len(free_sizes) else None
+        if added:
+            j = bisect.bisect_left(added, key)
+            if j < len(added) and (hole is None or added[j] < hole):
+                hole = added[j]
+        return hole
+
+    def largest(self):
+        # Lowest-addressed of the largest holes, as Worst Fit picks it
+        top = self.live(len(self.free_sizes) - 1, -1, self.skip_down)
+        largest = max(self.free_sizes[top][0] if top >= 0 else 0, self.added[-1][0] if self.added else 0)
+        return self.smallest_at_least(largest) if largest else None
+
+    def apply(self):
+        # The list with every held-back change made, copied slice by slice between the changed positions
+        free_sizes = self.free_sizes
+        kept = []
+        previous = 0
+        for position in sorted(bisect.bisect_left(free_sizes, key) for key in self.removed):
+            kept += free_sizes[previous:position]
+            previous = position + 1
+        kept += free_sizes[previous:]
+        merged = []
+        previous = 0
+        for key in self.added:
+            position = bisect.bisect_left(kept, key, previous)
+            merged += kept[previous:position]
+            merged.append(key)
+            previous = position
+        merged += kept[previous:]
+        return merged
+
+class DynamicMemory:
+    # Below this many holes, shifting free_sizes on every change costs less than holding changes back
+    deferral_threshold = 16384
+
+    def __init__(self, total_memory, copy_bandwidth=1e9):
+        self.total_memory = total_memory
+        # Bytes per second assumed when estimating how long compaction copies take
+        self.copy_bandwidth = copy_bandwidth
+        self.compaction_bytes_moved = 0
+        self.blocks = {}
+        # Free blocks indexed by address (for First/Next Fit and coalescing), by size (for Best/Worst Fit)
+        # and by size class (for TLSF, built the first time TLSF is used)
+        self.free_index = FreeBlockIndex()
+        self.free_sizes = []
+        self.tlsf_index = None
+        # Set while a batch holds back changes to free_sizes
+        self.deferred_sizes = None
+        # Next Fit resumes its search from here, just past the last placement
+        self.next_fit_start = 0
+        self.process_blocks = {}
+        # Whole blocks always fit their process exactly, so there is no internal fragmentation
+        self.free_memory = 0
+        self.used_memory = 0
+        self.splits = 0
+        self.merges = 0
+        self.last_scanned = 0
+        self.add_free_block(MemoryBlock(0, total_memory))
+
+    @property
+    def memory_blocks(self):
+        return [self.blocks[start] for start in sorted(self.blocks)]
+
+    def block_columns(self):
+        return block_columns(self.memory_blocks)
+
+    def allocate(self, new_process, strategy="First Fit"):
+        size = new_process.size
+        if strategy == "First Fit":
+            start = self.free_index.first_fit(size)
+            self.last_scanned = self.free_index.scanned
+            if start is not None:
+                self.place_process(self.blocks[start], new_process)
+                return True
+        elif strategy == "Best Fit":
+            # A single lookup in the size index
+            self.last_scanned = 1
+            if self.deferred_sizes is not None:
+                hole = self.deferred_sizes.smallest_at_least(size)
+                if hole is not None:
+                    self.place_process(self.blocks[hole[1]], new_process)
+                    return True
+            else:
+                i = bisect.bisect_left(self.free_sizes, (size, -1))
+                if i < len(self.free_sizes):
+                    self.place_process(self.blocks[self.free_sizes[i][1]], new_process)
+                    return True
+        elif strategy == "Worst Fit":
+            self.last_scanned = 1
+            if self.deferred_sizes is not None:
+                hole = self.deferred_sizes.largest()
+                if hole is not None and hole[0] >= size:
+                    self.place_process(self.blocks[hole[1]], new_process)
+                    return True
+            elif self.free_sizes and self.free_sizes[-1][0] >= size:
+                # Lowest address among the largest holes
+                i = bisect.bisect_left(self.free_sizes, (self.free_sizes[-1][0], -1))
+                self.place_process(self.blocks[self.free_sizes[i][1]], new_process)
+                return True
+        elif strategy == "Next Fit":
+            start = self.free_index.first_fit(size, self.next_fit_start)
+            self.last_scanned = self.free_index.scanned
+            if start is None and self.next_fit_start:
+                # Wrap around to the bottom of memory
+                start = self.free_index.first_fit(size)
+                self.last_scanned += self.free_index.scanned
+            if start is not None:
+                self.place_process(self.blocks[start], new_process)
+                self.next_fit_start = start + size
+                return True
+        elif strategy == "TLSF":
+            self.last_scanned = 1
+            if self.tlsf_index is None:
+                self.tlsf_index = TLSFIndex.from_holes(self.free_index)
+            start = self.tlsf_index.find(size)
+            if start is not None:
+                self.place_process(self.blocks[start], new_process)
+                return True
+        else:
+            raise ValueError(f"Unknown allocation strategy: {strategy}")
+        return False
+
+    def allocate_batch(self, sizes, first_pid, strategy="First Fit"):
+        # Placements happen one by one as single calls would make them, but on a large heap
+        # free_sizes is only rewritten once the whole batch is placed
+        if len(self.free_sizes) < self.deferral_threshold:
+            return allocate_each(self, sizes, first_pid, strategy)
+        self.deferred_sizes = DeferredSizes(self.free_sizes)
+        try:
+            return allocate_each(self, sizes, first_pid, strategy)
+        finally:
+            self.free_sizes = self.deferred_sizes.apply()
+            self.deferred_sizes = None
+
+    def free_batch(self, process_ids):
+        if len(self.free_sizes) < self.deferral_threshold:
+            return array('b', [self.free(process_id) for process_id in process_ids])
+        self.deferred_sizes = DeferredSizes(self.free_sizes)
+        try:
+            return array('b', [self.free(process_id) for process_id in process_ids])
+        finally:
+            self.free_sizes = self.deferred_sizes.apply()
+            self.deferred_sizes = None
+
+    def add_free_block(self, block):
+        self.blocks[block.start] = block
+        self.free_index.add(block.start, block.size)
+        if self.deferred_sizes is not None:
+            self.deferred_sizes.add(block.size, block.start)
+        else:
+            bisect.insort(self.free_sizes, (block.size, block.start))
+        if self.tlsf_index is not None:
+            self.tlsf_index.add(block.start, block.size)
+        self.free_memory += block.size
+
+    def remove_free_block(self, block):
+        self.free_index.remove(block.start)
+        if self.deferred_sizes is not None:
+            self.deferred_sizes.remove(block.size, block.start)
+        else:
+            del self.free_sizes[bisect.bisect_left(self.free_sizes, (block.size, block.start))]
+        if self.tlsf_index is not None:
+            self.tlsf_index.remove(block.start, block.size)
+        self.free_memory -= block.size
+
+    def place_process(self, block, new_process):
+        self.remove_free_block(block)
+        if block.size > new_process.size:
+            # The hole was maximal, so the remainder never touches another free block
+            self.add_free_block(MemoryBlock(block.start + new_process.size, block.size - new_process.size))
+            block.size = new_process.size
+            self.splits += 1
+        block.process = new_process
+        block.free = False
+        self.process_blocks[new_process.pid] = block.start
+        self.used_memory += block.size
+
+    def free(self, process_id):
+        start = self.process_blocks.pop(process_id, None)
+        if start is None:
+            return False
+        block = self.blocks[start]
+        block.free = True
+        block.process = None
+        self.used_memory -= block.size
+        self.merge_free_blocks(block)
+        return True
+
+    def merge_free_blocks(self, block):
+        # Absorb the following hole, then let the preceding hole absorb this one
+        next_start = block.start + block.size
+        if self.free_index.size_at(next_start) is not None:
+            next_block = self.blocks.pop(next_start)
+            self.remove_free_block(next_block)
+            block.size += next_block.size
+            self.merges += 1
+        previous = self.free_index.previous(block.start)
+        if previous is not None and previous[0] + previous[1] == block.start:
+            prev_block = self.blocks[previous[0]]
+            self.remove_free_block(prev_block)
+            del self.blocks[block.start]
+            prev_block.size += block.size
+            block = prev_block
+            self.merges += 1
+        if block.start < self.next_fit_start < block.start + block.size:
+            # Keep the rover at the start of the hole it fell into
+            self.next_fit_start = block.start
+        self.add_free_block(block)
+        return block
+
+    def compact(self, until_hole=None, byte_budget=None):
+        # Slide allocated blocks towards address 0 in address order. Stops early once a hole of
+        # until_hole exists or the next move would take the bytes moved past byte_budget.
+        largest_free_block = self.free_sizes[-1][0] if self.free_sizes else 0
+        if not self.process_blocks or (until_hole is not None and largest_free_block >= until_hole):
+            return CompactionResult(largest_free_block=largest_free_block)
+        count = len(self.process_blocks)
+        starts = np.fromiter(self.process_blocks.values(), np.int64, count)
+        starts.sort()
+        blocks = self.blocks
+        sizes = np.fromiter((blocks[start].size for start in starts.tolist()), np.int64, count)
+        ends = np.cumsum(sizes)
+        new_starts = ends - sizes
+        moved_bytes = np.where(new_starts != starts, sizes, 0)
+        limit = count
+        if until_hole is not None:
+            # After the first k blocks move, the largest hole is either the one left behind them
+            # or an untouched gap further up
+            next_starts = np.append(starts[1:], self.total_memory)
+            left_behind = next_starts - ends
+            gaps = next_starts - (starts + sizes)
+            gaps_above = np.append(np.maximum.accumulate(gaps[::-1])[::-1][1:], 0)
+            reached = np.maximum(left_behind, gaps_above) >= until_hole
+            if reached.any():
+                limit = int(np.argmax(reached)) + 1
+        if byte_budget is not None:
+            over_budget = np.cumsum(moved_bytes) > byte_budget
+            if over_budget.any():
+                limit = min(limit, int(np.argmax(over_budget)))
+        if limit == 0 or not moved_bytes[:limit].any():
+            return CompactionResult(largest_free_block=largest_free_block, complete=limit == count)
+
+        boundary = int(starts[limit]) if limit < count else self.total_memory
+        # Every hole below the boundary is swallowed into the single hole left behind the moved blocks
+        holes = list(self.free_index)
+        swallowed = bisect.bisect_left(holes, (boundary, 0))
+        if swallowed > len(holes) // 16:
+            # Cheaper to rebuild both indexes than to delete holes one at a time
+            for start, size in holes[:swallowed]:
+                del blocks[start]
+            self.free_index = FreeBlockIndex.from_holes(holes[swallowed:])
+            self.free_sizes = sorted((size, start) for start, size in holes[swallowed:])
+            if self.tlsf_index is not None:
+                self.tlsf_index = TLSFIndex.from_holes(holes[swallowed:])
+            self.free_memory = sum(size for start, size in holes[swallowed:])
+        else:
+            for start, size in holes[:swallowed]:
+                self.remove_free_block(blocks.pop(start))
+        moving = np.flatnonzero(moved_bytes[:limit]).tolist()
+        moved_blocks = [blocks.pop(int(starts[i])) for i in moving]
+        for i, block in zip(moving, moved_blocks):
+            block.start = int(new_starts[i])
+            blocks[block.start] = block
+            self.process_blocks[block.process.pid] = block.start
+        end = int(ends[limit - 1])
+        if boundary > end:
+            self.add_free_block(MemoryBlock(end, boundary - end))
+        if self.next_fit_start < boundary:
+            # Everything below the boundary has been repacked, so resume at the hole left behind
+            self.next_fit_start = end
+        bytes_moved = int(moved_bytes[:limit].sum())
+        self.compaction_bytes_moved += bytes_moved
+        return CompactionResult(len(moving), bytes_moved, bytes_moved / self.copy_bandwidth,
+                                self.free_sizes[-1][0] if self.free_sizes else 0, limit == count)
+
+    def stats(self):
+        largest_free_block = self.free_sizes[-1][0] if self.free_sizes else 0
+        return memory_stats(self.total_memory, self.used_memory, 0, self.free_memory, largest_free_block,
+                            len(self.free_sizes))
+
+class BuddyMemory:
+    def __init__(self, total_memory):
+        self.total_memory = total_memory
+        self.max_order = total_memory.bit_length() - 1
+        # One free list of block addresses per order, a block of order k having size 2**k. Each list is an
+        # insertion-ordered dict, so the block handed out is well defined and survives a snapshot.
+        self.free_lists = [{} for _ in range(self.max_order + 1)]
+        self.allocated = {}
+        self.processes = {}
+        self.allocated_memory = 0
+        self.used_memory = 0
+        self.free_block_count = 0
+        self.splits = 0
+        self.merges = 0
+        self.last_scanned = 0
+        # Carve memory into power-of-two chunks, largest first, so every chunk is naturally aligned
+        start = 0
+        for order in range(self.max_order, -1, -1):
+            if total_memory & (1 << order):
+                self.free_lists[order][start] = None
+                self.free_block_count += 1
+                start += 1 << order
+
+    @property
+    def buddy_memory_blocks(self):
+        blocks = []
+        for order, free_list in enumerate(self.free_lists):
+            for start in free_list:
+                blocks.append(BuddyMemoryBlock(start, 1 << order))
+        for start, order in self.allocated.values():
+            block = BuddyMemoryBlock(start, 1 << order)
+            block.free = False
+            block.process = self.processes[start]
+            blocks.append(block)
+        blocks.sort(key=lambda block: block.start)
+        return blocks
+
+    def block_columns(self):
+        return block_columns(self.buddy_memory_blocks)
+
+    def allocate(self, new_process, strategy=None):
+        order = max(new_process.size - 1, 0).bit_length()
+        found = self.find_buddy_block(order)
+        if found is None:
+            return False
+        start = self.split_block(found[0], found[1], order)
+        self.allocated[new_process.pid] = (start, order)
+        self.processes[start] = new_process
+        self.allocated_memory += 1 << order
+        self.used_memory += new_process.size
+        return True
+
+    def find_buddy_block(self, order):
+        # Smallest free block that can hold the request
+        self.last_scanned = 0
+        for found_order in range(order, self.max_order + 1):
+            self.last_scanned = found_order - order + 1
+            if self.free_lists[found_order]:
+                self.free_block_count -= 1
+                # Most recently freed first, as a free list hands them out
+                return self.free_lists[found_order].popitem()[0], found_order
+        return None
+
+    def split_block(self, start, order, target_order):
+        # Keep the lower half and release each upper half to the next order down
+        while order > target_order:
+            order -= 1
+            self.free_lists[order][start + (1 << order)] = None
+            self.free_block_count += 1
+            self.splits += 1
+        return start
+
+    def free(self, process_id):
+        if process_id not in self.allocated:
+            return False
+        start, order = self.allocated.pop(process_id)
+        self.used_memory -= self.processes.pop(start).size
+        self.allocated_memory -= 1 << order
+        self.merge_block(start, order)
+        return True
+
+    def merge_block(self, start, order):
+        # Coalesce with the buddy at every level for as long as it is free
+        while order < self.max_order:
+            buddy = start ^ (1 << order)
+            free_list = self.free_lists[order]
+            if buddy not in free_list:
+                break
+            del free_list[buddy]
+            self.free_block_count -= 1
+            self.merges += 1
+            start = min(start, buddy)
+            order += 1
+        self.free_lists[order][start] = None
+        self.free_block_count += 1
+        return start, order
+
+    def compact(self):
+        return False
+
+    def stats(self):
+        largest_free_block = 0
+        for order in range(self.max_order, -1, -1):
+            if self.free_lists[order]:
+                largest_free_block = 1 << order
+                break
+        return memory_stats(self.total_memory, self.used_memory, self.allocated_memory - self.used_memory,
+                            self.total_memory - self.allocated_memory, largest_free_block, self.free_block_count)
+
+class PagingMemory:
+    def __init__(self, total_memory, page_size=100, contiguous=False, page_table_levels=1, virtual_address_bits=32,
+                 tlb_size=0, tlb_policy="LRU", tlb_latency=1, memory_latency=100,
+                 demand_paging=False, replacement="LRU", future_references=None, page_fault_latency=1000000,
+                 working_set_window=1000):
+        if page_size <= 0:
+            raise ValueError("Page size must be positive.")
+        self.total_memory = total_memory
+        self.page_size = page_size
+        self.contiguous = contiguous
+        self.frames = FrameTable(total_memory // page_size)
+        self.page_table = {}
+        self.process_sizes = {}
+        self.used_memory = 0
+        # Multi-level tables are only built when asked for; a single level is the frame list itself
+        self.page_table_levels = page_table_levels
+        self.virtual_address_bits = virtual_address_bits
+        self.virtual_pages = (1 << virtual_address_bits) // page_size
+        self.page_tables = {}
+        self.tlb = TLB(tlb_size, tlb_policy)
+        self.tlb_latency = tlb_latency
+        self.memory_latency = memory_latency
+        self.translations = 0
+        self.translation_time = 0
+        # With demand paging processes only reserve virtual pages; frames are faulted in on access
+        self.pager = None
+        if demand_paging:
+            self.pager = DemandPager(self.frames.num_frames, replacement, future_references, working_set_window)
+        self.page_fault_latency = page_fault_latency
+        self.resident_slack = 0
+
+    @property
+    def pages(self):
+        # Owner of every frame, built on demand for display
+        pages = [None] * self.frames.num_frames
+        for pid, frames in self.page_table.items():
+            for frame in frames:
+                if frame >= 0:
+                    pages[frame] = pid
+        return pages
+
+    def block_columns(self):
+        # One block per frame
+        num_frames = self.frames.num_frames
+        pids = array('q', [-1]) * num_frames
+        process_sizes = array('q', [0]) * num_frames
+        for pid, frames in self.page_table.items():
+            remaining = self.process_sizes[pid]
+            for frame in frames:
+                if frame >= 0:
+                    pids[frame] = pid
+                    process_sizes[frame] = min(remaining, self.page_size)
+                remaining -= self.page_size
+        return {"start": array('q', range(0, num_frames * self.page_size, self.page_size)),
+                "size": array('q', [self.page_size]) * num_frames, "pid": pids, "process_size": process_sizes}
+
+    def allocate(self, new_process, strategy=None):
+        pages_needed = math.ceil(new_process.size / self.page_size)
+        if pages_needed > self.virtual_pages:
+            # Pages beyond the virtual address space could not be translated
+            return False
+        if self.pager is not None:
+            frames = array('q', [-1]) * pages_needed
+        elif self.contiguous:
+            frames = self.frames.allocate_run(pages_needed)
+        else:
+            frames = self.frames.allocate(pages_needed)
+        if frames is None:
+            return False
+        self.register_process(new_process, frames)
+        return True
+
+    def allocate_batch(self, sizes, first_pid, strategy=None):
+        # Admit requests in order while frames last, then claim every admitted page in one bitmap pass
+        if self.pager is not None or self.contiguous:
+            return allocate_each(self, sizes, first_pid, strategy)
+        placed = [None] * len(sizes)
+        available = self.frames.free_count
+        admitted = []
+        for i, size in enumerate(sizes):
+            pages_needed = math.ceil(size / self.page_size)
+            if pages_needed <= available and pages_needed <= self.virtual_pages:
+                available -= pages_needed
+                admitted.append((i, pages_needed))
+        frames = self.frames.allocate(self.frames.free_count - available)
+        offset = 0
+        for pid, (i, pages_needed) in enumerate(admitted, first_pid):
+            placed[i] = Process(pid, sizes[i])
+            self.register_process(placed[i], frames[offset:offset + pages_needed])
+            offset += pages_needed
+        return placed
+
+    def register_process(self, new_process, frames):
+        self.page_table[new_process.pid] = frames
+        if self.page_table_levels > 1:
+            page_table = PageTable(self.virtual_pages, self.page_table_levels)
+            if self.pager is None:
+                for vpn, frame in enumerate(frames):
+                    page_table.map(vpn, frame)
+            self.page_tables[new_process.pid] = page_table
+        self.process_sizes[new_process.pid] = new_process.size
+        self.used_memory += new_process.size
+
+    def free(self, process_id):
+        if process_id not in self.page_table:
+            return False
+        frames = self.page_table[process_id]
+        if self.pager is not None:
+            for vpn, frame in enumerate(frames):
+                if frame >= 0:
+                    self.map_page(process_id, vpn, -1)
+                    self.pager.release((process_id, vpn))
+        else:
+            self.frames.release(frames)
+        self.forget_process(process_id)
+        return True
+
+    def free_batch(self, process_ids):
+        if self.pager is not None:
+            return array('b', [self.free(process_id) for process_id in process_ids])
+        results = array('b', [0]) * len(process_ids)
+        release = self.frames.release
+        for i, process_id in enumerate(process_ids):
+            if process_id in self.page_table:
+                # Each process's frames are released whole words at a time where they form a run
+                release(self.page_table[process_id])
+                self.forget_process(process_id)
+                results[i] = 1
+        return results
+
+    def forget_process(self, process_id):
+        del self.page_table[process_id]
+        self.page_tables.pop(process_id, None)
+        self.tlb.invalidate(process_id)
+        self.used_memory -= self.process_sizes.pop(process_id)
+
+    def translate(self, process_id, virtual_address):
+        frames = self.page_table.get(process_id)
+        if frames is None:
+            raise ValueError(f"Process {process_id} is not in memory.")
+        vpn, offset = divmod(virtual_address, self.page_size)
+        if virtual_address < 0 or vpn >= len(frames):
+            raise ValueError(f"Address {virtual_address} is outside process {process_id}.")
+        self.translations += 1
+        key = (process_id, vpn)
+        if self.pager is not None:
+            # Every reference goes through the replacement policy so it sees recency
+            frame, faulted, evicted = self.pager.access(key)
+            if faulted:
+                self.translation_time += self.page_fault_latency
+                if evicted is not None:
+                    self.map_page(evicted[0], evicted[1], -1)
+                    self.tlb.invalidate(evicted[0], evicted[1])
+                self.map_page(process_id, vpn, frame)
+        tlb_cost = self.tlb_latency if self.tlb.size else 0
+        cached_frame = self.tlb.lookup(key)
+        if cached_frame is None:
+            # Walk the page table, one memory access per level
+            if self.pager is None:
+                frame = self.page_tables[process_id].lookup(vpn) if self.page_table_levels > 1 else frames[vpn]
+            self.tlb.insert(key, frame)
+            self.translation_time += tlb_cost + self.page_table_levels * self.memory_latency
+        else:
+            frame = cached_frame
+            self.translation_time += tlb_cost
+        self.translation_time += self.memory_latency
+        return frame * self.page_size + offset
+
+    def map_page(self, process_id, vpn, frame):
+        frames = self.page_table[process_id]
+        frames[vpn] = frame
+        if self.page_table_levels > 1:
+            self.page_tables[process_id].map(vpn, frame)
+        if vpn == len(frames) - 1:
+            # Only the last page of a process can be partly empty
+            slack = len(frames) * self.page_size - self.process_sizes[process_id]
+            self.resident_slack += slack if frame >= 0 else -slack
+
+    def translation_stats(self):
+        stats = {
+            "translations": self.translations,
+            "tlb_hits": self.tlb.hits,
+            "tlb_misses": self.tlb.misses,
+            "tlb_hit_rate": self.tlb.hit_rate(),
+            "average_access_latency": self.translation_time / self.translations if self.translations else 0.0,
+            "page_table_count": sum(page_table.table_count for page_table in self.page_tables.values()) or len(self.page_table),
+        }
+        if self.pager is not None:
+            stats.update(self.pager.stats())
+        return stats
+
+    def compact(self):
+        return False
+
+    def stats(self):
+        if self.pager is not None:
+            used_frames = len(self.pager.resident)
+            internal_fragmentation = self.resident_slack
+        else:
+            used_frames = self.frames.num_frames - self.frames.free_count
+            internal_fragmentation = used_frames * self.page_size - self.used_memory
+        free_frames = self.frames.num_frames - used_frames
+        if self.contiguous:
+            # Only contiguous runs can serve a request, so measure the longest one
+            largest_free_block = self.frames.longest_run() * self.page_size
+        else:
+            largest_free_block = free_frames * self.page_size
+        return memory_stats(self.total_memory, used_frames * self.page_size - internal_fragmentation,
+                            internal_fragmentation, free_frames * self.page_size, largest_free_block, free_frames)
+
+class SlabMemory:
+    # Segregated storage: requests are rounded up to a size class and carved out of slabs of that class.
+    # Requests larger than every class take a run of whole slabs.
+    def __init__(self, total_memory, size_classes=None, slab_size=4096, reclaim_empty=True):
+        size_classes = sorted(set(size_classes or DEFAULT_SIZE_CLASSES))
+        if size_classes[0] <= 0 or slab_size <= 0:
+            raise ValueError("Size classes and slab size must be positive.")
+        self.total_memory = total_memory
+        self.slab_size = min(slab_size, total_memory)
+        # A class only makes sense if at least one object fits in a slab
+        self.size_classes = [size for size in size_classes if size <= self.slab_size]
+        self.objects_per_slab = [self.slab_size // size for size in self.size_classes]
+        self.reclaim_empty = reclaim_empty
+        self.slabs = FrameTable(total_memory // self.slab_size)
+        # Slabs of each class with at least one free object, in insertion order; the last one is filled first
+        self.partial_slabs = [{} for _ in self.size_classes]
+        self.class_slabs = [0] * len(self.size_classes)
+        self.class_free_objects = [0] * len(self.size_classes)
+        self.slab_class = {}
+        # Free object indexes of each slab, used as a stack, and the process held by every object
+        self.slab_free = {}
+        self.slab_objects = {}
+        self.objects = {}
+        self.large_objects = {}
+        self.used_memory = 0
+        self.internal_fragmentation = 0
+        self.free_object_memory = 0
+        self.free_object_count = 0
+        self.slabs_created = 0
+        self.slabs_reclaimed = 0
+        self.last_scanned = 0
+
+    @property
+    def memory_blocks(self):
+        large_starts = {first: (count, process) for first, count, process in self.large_objects.values()}
+        blocks = []
+        slab = 0
+        while slab < self.slabs.num_frames:
+            start = slab * self.slab_size
+            if slab in large_starts:
+                count, process = large_starts[slab]
+                block = MemoryBlock(start, count * self.slab_size)
+                block.free = False
+                block.process = process
+                blocks.append(block)
+                slab += count
+                continue
+            if slab in self.slab_class:
+                object_size = self.size_classes[self.slab_class[slab]]
+                for index, process in enumerate(self.slab_objects[slab]):
+                    block = MemoryBlock(start + index * object_size, object_size)
+                    if process is not None:
+                        block.free = False
+                        block.process = process
+                    blocks.append(block)
+            else:
+                blocks.append(MemoryBlock(start, self.slab_size))
+            slab += 1
+        return blocks
+
+    def block_columns(self):
+        return block_columns(self.memory_blocks)
+
+    def class_stats(self):
+        rows = []
+        for size_class, object_size in enumerate(self.size_classes):
+            free_objects = self.class_free_objects[size_class]
+            rows.append({"size": object_size, "slabs": self.class_slabs[size_class],
+                         "objects": self.class_slabs[size_class] * self.objects_per_slab[size_class] - free_objects,
+                         "free_objects": free_objects})
+        return rows
+
+    def allocate(self, new_process, strategy=None):
+        self.last_scanned = 1
+        size_class = bisect.bisect_left(self.size_classes, new_process.size)
+        if size_class == len(self.size_classes):
+            return self.allocate_large(new_process)
+        partial = self.partial_slabs[size_class]
+        if partial:
+            slab = partial.popitem()[0]
+        else:
+            slab = self.create_slab(size_class)
+            if slab is None:
+                return False
+        free_list = self.slab_free[slab]
+        index = free_list.pop()
+        self.slab_objects[slab][index] = new_process
+        self.objects[new_process.pid] = (slab, index)
+        if free_list:
+            partial[slab] = None
+        object_size = self.size_classes[size_class]
+        self.class_free_objects[size_class] -= 1
+        self.free_object_count -= 1
+        self.free_object_memory -= object_size
+        self.used_memory += new_process.size
+        self.internal_fragmentation += object_size - new_process.size
+        return True
+
+    def allocate_large(self, new_process):
+        count = math.ceil(new_process.size / self.slab_size)
+        slabs = self.slabs.allocate_run(count)
+        if slabs is None:
+            return False
+        self.large_objects[new_process.pid] = (slabs[0], count, new_process)
+        self.used_memory += new_process.size
+        self.internal_fragmentation += count * self.slab_size - new_process.size
+        return True
+
+    def create_slab(self, size_class):
+        slabs = self.slabs.allocate(1)
+        if slabs is None:
+            return None
+        slab = slabs[0]
+        count = self.objects_per_slab[size_class]
+        object_size = self.size_classes[size_class]
+        self.slab_class[slab] = size_class
+        # Reversed so objects are handed out from the start of the slab
+        self.slab_free[slab] = list(range(count - 1, -1, -1))
+        self.slab_objects[slab] = [None] * count
+        self.class_slabs[size_class] += 1
+        self.class_free_objects[size_class] += count
+        self.free_object_count += count
+        self.free_object_memory += count * object_size
+        # The tail of a slab too small for another object is lost to internal fragmentation
+        self.internal_fragmentation += self.slab_size - count * object_size
+        self.slabs_created += 1
+        return slab
+
+    def free(self, process_id):
+        if process_id in self.large_objects:
+            first, count, process = self.large_objects.pop(process_id)
+            self.slabs.release(array('q', range(first, first + count)))
+            self.used_memory -= process.size
+            self.internal_fragmentation -= count * self.slab_size - process.size
+            return True
+        location = self.objects.pop(process_id, None)
+        if location is None:
+            return False
+        slab, index = location
+        size_class = self.slab_class[slab]
+        object_size = self.size_classes[size_class]
+        process = self.slab_objects[slab][index]
+        self.slab_objects[slab][index] = None
+        free_list = self.slab_free[slab]
+        free_list.append(index)
+        self.class_free_objects[size_class] += 1
+        self.free_object_count += 1
+        self.free_object_memory += object_size
+        self.used_memory -= process.size
+        self.internal_fragmentation -= object_size - process.size
+        if len(free_list) == self.objects_per_slab[size_class] and self.reclaim_empty:
+            self.reclaim_slab(slab)
+        elif len(free_list) == 1:
+            self.partial_slabs[size_class][slab] = None
+        return True
+
+    def reclaim_slab(self, slab):
+        # Hand an empty slab back to the pool so any class, or a large object, can reuse it
+        size_class = self.slab_class.pop(slab)
+        count = self.objects_per_slab[size_class]
+        object_size = self.size_classes[size_class]
+        del self.slab_free[slab]
+        del self.slab_objects[slab]
+        self.partial_slabs[size_class].pop(slab, None)
+        self.class_slabs[size_class] -= 1
+        self.class_free_objects[size_class] -= count
+        self.free_object_count -= count
+        self.free_object_memory -= count * object_size
+        self.internal_fragmentation -= self.slab_size - count * object_size
+        self.slabs.release(array('q', [slab]))
+        self.slabs_reclaimed += 1
+
+    def compact(self):
+        # Objects never move between slabs
+        return False
+
+    def stats(self):
+        largest_free_block = self.slabs.longest_run() * self.slab_size
+        for size_class in range(len(self.size_classes) - 1, -1, -1):
+            if self.class_free_objects[size_class]:
+                largest_free_block = max(largest_free_block, self.size_classes[size_class])
+                break
+        return memory_stats(self.total_memory, self.used_memory, self.internal_fragmentation,
+                            self.slabs.free_count * self.slab_size + self.free_object_memory, largest_free_block,
+                            self.slabs.free_count + self.free_object_count)
+
+def allocate_each(engine, sizes, first_pid, strategy=None):
+    # One allocate call per request; pids are handed out consecutively to the requests that are placed
+    placed = []
+    pid = first_pid
+    for size in sizes:
+        new_process = Process(pid, size)
+        if engine.allocate(new_process, strategy):
+            placed.append(new_process)
+            pid += 1
+        else:
+            placed.append(None)
+    return placed
+
+def create_engine(technique, total_memory, seed=None, **options):
+    if total_memory <= 0:
+        raise ValueError("Total memory size must be positive.")
+    if technique == "Fixed-sized Partitioning":
+        return PartitionedMemory(fixed_size_partitions(total_memory), total_memory)
+    elif technique == "Unequal-sized Partitioning":
+        return PartitionedMemory(unequal_size_partitions(total_memory, rng=random.Random(seed)), total_memory)
+    elif technique == "Dynamic Allocation":
+        return DynamicMemory(total_memory, **options)
+    elif technique == "Buddy System":
+        return BuddyMemory(total_memory)
+    elif technique == "Paging":
+        return PagingMemory(total_memory, **options)
+    elif technique == "Slab Allocation":
+        return SlabMemory(total_memory, **options)
+    raise ValueError(f"Unknown memory management technique: {technique}")
+
+class MemorySimulator:
+    def __init__(self, technique, total_memory, strategy="First Fit", seed=None, engine=None, **options):
+        self.technique = technique
+        self.strategy = strategy
+        # An already populated engine, such as one restored from a snapshot, can be passed in
+        self.engine = engine if engine is not None else create_engine(technique, total_memory, seed, **options)
+        self.processes = {}
+        self.process_id_counter = 1
+
+    @property
+    def total_memory(self):
+        return self.engine.total_memory
+
+    def add_process(self, size, strategy=None, pid=None):
+        if size <= 0:
+            raise ValueError("Process size must be positive.")
+        if pid is None:
+            pid = self.process_id_counter
+        elif pid in self.processes:
+            raise ValueError(f"Process {pid} is already in memory.")
+        new_process = Process(pid, size)
+        if not self.engine.allocate(new_process, strategy or self.strategy):
+            return None
+        self.processes[pid] = new_process
+        self.process_id_counter = max(self.process_id_counter, pid + 1)
+        return new_process
+
+    def remove_process(self, process_id):
+        if self.processes.pop(process_id, None) is None:
+            return False
+        return self.engine.free(process_id)
+
+    def add_processes(self, sizes, strategy=None, largest_first=False):
+        # Bulk admission: returns the pid given to each request, or 0 where it could not be placed.
+        # largest_first places big requests before small ones (First/Best Fit Decreasing). As with
+        # add_process, only placed requests take a pid, handed out in placement order.
+        sizes = sizes.tolist() if hasattr(sizes, "tolist") else list(sizes)
+        if any(size <= 0 for size in sizes):
+            raise ValueError("Process size must be positive.")
+        order = range(len(sizes))
+        if largest_first:
+            order = sorted(order, key=lambda i: -sizes[i])
+        ordered = [sizes[i] for i in order]
+        strategy = strategy or self.strategy
+        allocate_batch = getattr(self.engine, "allocate_batch", None)
+        if allocate_batch is not None:
+            placed = allocate_batch(ordered, self.process_id_counter, strategy)
+        else:
+            placed = allocate_each(self.engine, ordered, self.process_id_counter, strategy)
+        results = array('q', [0]) * len(sizes)
+        for i, process in zip(order, placed):
+            if process is not None:
+                results[i] = process.pid
+                self.processes[process.pid] = process
+                self.process_id_counter = max(self.process_id_counter, process.pid + 1)
+        return results
+
+    def remove_processes(self, process_ids):
+        # Returns 1 for each pid that was in memory and has been freed, 0 otherwise
+        process_ids = process_ids.tolist() if hasattr(process_ids, "tolist") else list(process_ids)
+        results = array('b', [self.processes.pop(process_id, None) is not None for process_id in process_ids])
+        present = [process_id for process_id, removed in zip(process_ids, results) if removed]
+        free_batch = getattr(self.engine, "free_batch", None)
+        if free_batch is not None:
+            free_batch(present)
+        else:
+            for process_id in present:
+                self.engine.free(process_id)
+        return results
+
+    def compact(self, **options):
+        return self.engine.compact(**options)
+
+    def stats(self):
+        return self.engine.stats()
@@ -0,0 +1,135 @@
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+from matplotlib.colors import to_rgb
+
+# Colours of the three kinds of memory on the map
+FREE_COLOR = "black"
+PROCESS_COLOR = "lightgrey"
+HOLE_COLOR = "grey"
+# Blocks are only labelled once each has roughly this many pixels to itself
+LABEL_PIXELS = 60
+GRAPH_TITLES = {"Buddy System": "Buddy System Memory Allocation", "Paging": "Paging Memory Allocation"}
+
+def memory_segments(columns):
+    # Split blocks into free blocks, the part each process uses and the hole left in its block,
+    # as (starts, widths) arrays in address order
+    starts, sizes, pids, process_sizes = (np.asarray(columns[name], np.int64)
+                                          for name in ("start", "size", "pid", "process_size"))
+    free = pids < 0
+    used = ~free
+    holes = used & (sizes > process_sizes)
+    return {
+        "free": (starts[free], sizes[free]),
+        "process": (starts[used], process_sizes[used]),
+        "hole": ((starts + process_sizes)[holes], (sizes - process_sizes)[holes]),
+    }
+
+def coverage(starts, widths, edges):
+    # Bytes of non-overlapping, address-ordered intervals that fall in each bin between edges.
+    # Covered bytes below x are piecewise linear in x, so interpolate them at the bin edges.
+    if not len(starts):
+        return np.zeros(len(edges) - 1)
+    before = np.concatenate(([0], np.cumsum(widths)[:-1]))
+    points = np.column_stack((starts, starts + widths)).ravel()
+    covered = np.column_stack((before, before + widths)).ravel()
+    return np.diff(np.interp(edges, points, covered))
+
+class MemoryMap:
+    # Level-of-detail memory map: exact bars when few blocks are in view, otherwise one raster image
+    # with a pixel-wide bin per column. Redrawn for the visible range whenever the x limits change.
+    def __init__(self, columns, total_memory, bins=None, label_limit=40):
+        self.columns = columns
+        self.segments = memory_segments(columns)
+        self.starts = np.asarray(columns["start"], np.int64)
+        self.ends = self.starts + np.asarray(columns["size"], np.int64)
+        self.total_memory = total_memory
+        self.bins = bins
+        self.label_limit = label_limit
+        self.artists = []
+
+    def draw(self, ax, title="Memory Allocation", free_label="Free Block"):
+        ax.set_title(title)
+        ax.set_xlabel("Memory")
+        ax.set_yticks([])
+        ax.set_xlim(0, self.total_memory)
+        ax.set_ylim(-1, 1)
+        handles = [Rectangle((0, 0), 1, 1, color=color) for color in (FREE_COLOR, PROCESS_COLOR, HOLE_COLOR)]
+        ax.legend(handles, [free_label, "Process", "Hole"], loc="upper right")
+        self.render(ax)
+
+        def redraw(changed_ax):
+            self.render(changed_ax)
+            changed_ax.figure.canvas.draw_idle()
+
+        ax.callbacks.connect("xlim_changed", redraw)
+        return self
+
+    def render(self, ax):
+        for artist in self.artists:
+            artist.remove()
+        self.artists = []
+        low, high = ax.get_xlim()
+        first = int(np.searchsorted(self.ends, low, side="right"))
+        last = int(np.searchsorted(self.starts, high, side="left"))
+        visible = last - first
+        pixels = max(int(ax.get_window_extent().width), 1)
+        bins = self.bins or pixels
+        if visible <= bins:
+            self.render_blocks(ax, low, high)
+            if visible <= self.label_limit and visible * LABEL_PIXELS <= pixels:
+                self.render_labels(ax, first, last)
+        else:
+            self.render_bins(ax, low, high, bins)
+
+    def render_blocks(self, ax, low, high):
+        # One collection per kind of memory, holding only the blocks in view
+        for kind, color in (("free", FREE_COLOR), ("process", PROCESS_COLOR), ("hole", HOLE_COLOR)):
+            starts, widths = self.segments[kind]
+            in_view = (starts + widths > low) & (starts < high)
+            if in_view.any():
+                edgecolor = HOLE_COLOR if kind == "hole" else "black"
+                self.artists.append(ax.broken_barh(np.column_stack((starts[in_view], widths[in_view])), (-0.4, 0.8),
+                                                   facecolors=color, edgecolors=edgecolor))
+
+    def render_labels(self, ax, first, last):
+        columns = self.columns
+        for i in range(first, last):
+            start, size, pid = columns["start"][i], columns["size"][i], columns["pid"][i]
+            if pid < 0:
+                self.artists.append(ax.text(start + size / 2, 0, f"Free\nSize: {size}", ha="center", va="center",
+                                            color="white", fontsize=8))
+            else:
+                process_size = columns["process_size"][i]
+                self.artists.append(ax.text(start + process_size / 2, 0, f"P{pid}\n({process_size})", ha="center",
+                                            va="center", color="black", fontsize=8))
+
+    def render_bins(self, ax, low, high, bins):
+        # Each pixel column is coloured by the share of its bytes that are free, used or lost to holes;
+        # bytes no block covers stay white
+        edges = np.linspace(low, high, bins + 1)
+        image = np.zeros((bins, 3))
+        covered = np.zeros(bins)
+        for kind, color in (("free", FREE_COLOR), ("process", PROCESS_COLOR), ("hole", HOLE_COLOR)):
+            share = coverage(*self.segments[kind], edges) / np.diff(edges)
+            image += share[:, None] * to_rgb(color)
+            covered += share
+        image += np.clip(1 - covered, 0, 1)[:, None]
+        self.artists.append(ax.imshow(image[None, :, :], extent=(low, high, -0.4, 0.4), aspect="auto",
+                                      interpolation="nearest", zorder=1))
+        # imshow resets the limits to the image extent
+        ax.set_xlim(low, high, emit=False)
+        ax.set_ylim(-1, 1)
+
+def draw_memory_map(ax, simulator, **options):
+    # Memory map of a simulator's current state on the given axes
+    free_label = "Free Frame" if simulator.technique == "Paging" else "Free Block"
+    memory_map = MemoryMap(simulator.engine.block_columns(), simulator.total_memory, **options)
+    return memory_map.draw(ax, GRAPH_TITLES.get(simulator.technique, "Memory Allocation"), free_label)
+
+def save_memory_map(simulator, path, width=10, height=5, dpi=100, **options):
+    # Renders without pyplot, so it works with no display attached
+    figure = Figure(figsize=(width, height), dpi=dpi)
+    draw_memory_map(figure.add_subplot(), simulator, **options)
+    figure.savefig(path)
+    return path
@@ -0,0 +1,509 @@
+from collections import OrderedDict, deque
+from array import array
+import heapq
+
+WORD_BITS = 64
+FULL_WORD = (1 << WORD_BITS) - 1
+
+def word_runs(word):
+    # Free frames at the low end, at the high end, and the longest run of free frames in one word
+    if word == FULL_WORD:
+        return WORD_BITS, WORD_BITS, WORD_BITS
+    low = ((word ^ (word + 1)) >> 1).bit_length()
+    high = WORD_BITS - (~word & FULL_WORD).bit_length()
+    longest = 0
+    while word:
+        # Each step shortens every run by one, so the steps taken are the longest run
+        word &= word >> 1
+        longest += 1
+    return low, high, longest
+
+class RunIndex:
+    # Segment tree over the words of a frame table. Each node keeps the free frames at the start and
+    # end of its range and its longest free run, so the longest run is read at the root and the
+    # lowest run of a given length is found by one descent instead of a walk along the bitmap.
+    def __init__(self, words):
+        leaves = 1
+        while leaves < len(words):
+            leaves *= 2
+        self.leaves = leaves
+        self.prefix = array('q', [0]) * (2 * leaves)
+        self.suffix = array('q', [0]) * (2 * leaves)
+        self.longest = array('q', [0]) * (2 * leaves)
+        for index, word in enumerate(words):
+            self.prefix[leaves + index], self.suffix[leaves + index], self.longest[leaves + index] = word_runs(word)
+        for node in range(leaves - 1, 0, -1):
+            self.pull(node)
+
+    def span(self, node):
+        # Frames covered by a node
+        return WORD_BITS * (self.leaves >> (node.bit_length() - 1))
+
+    def pull(self, node):
+        left, right = 2 * node, 2 * node + 1
+        half = self.span(left)
+        prefix, suffix, longest = self.prefix, self.suffix, self.longest
+        prefix[node] = prefix[left] if prefix[left] < half else half + prefix[right]
+        suffix[node] = suffix[right] if suffix[right] < half else half + suffix[left]
+        longest[node] = max(longest[left], longest[right], suffix[left] + prefix[right])
+
+    def update(self, words, first, last):
+        # Refresh after words first..last changed
+        leaves = self.leaves
+        for index in range(first, last + 1):
+            self.prefix[leaves + index], self.suffix[leaves + index], self.longest[leaves + index] = word_runs(words[index])
+        low, high = (leaves + first) // 2, (leaves + last) // 2
+        while low:
+            for node in range(low, high + 1):
+                self.pull(node)
+            low, high = low // 2, high // 2
+
+    def longest_run(self):
+        return self.longest[1]
+
+    def find(self, words, count):
+        # Start of the lowest run of count free frames, or None
+        if self.longest[1] < count:
+            return None
+        node, base = 1, 0
+        while node < self.leaves:
+            left, right = 2 * node, 2 * node + 1
+            half = self.span(left)
+            if self.longest[left] >= count:
+                node = left
+            elif self.suffix[left] + self.prefix[right] >= count:
+                return base + half - self.suffix[left]
+            else:
+                node, base = right, base + half
+        # The run lies inside a single word
+        word = words[node - self.leaves]
+        position = 0
+        while word >> position:
+            shifted = word >> position
+            if shifted & 1:
+                ones = ((shifted ^ (shifted + 1)) >> 1).bit_length()
+                if ones >= count:
+                    return base + position
+                position += ones
+            else:
+                position += (shifted & -shifted).bit_length() - 1
+        return None
+
+class FrameTable:
+    # One bit per frame, set while the frame is free, packed 64 frames to a word
+    def __init__(self, num_frames):
+        self.num_frames = num_frames
+        self.free_count = num_frames
+        num_words = (num_frames + WORD_BITS - 1) // WORD_BITS
+        self.words = array('Q', [FULL_WORD]) * num_words
+        if num_frames % WORD_BITS:
+            self.words[-1] = (1 << (num_frames % WORD_BITS)) - 1
+        # No word below this index has a free frame
+        self.first_free_word = 0
+        # Only built once a caller needs contiguous runs, since every bitmap change must then update it
+        self.run_index = None
+
+    def is_free(self, frame):
+        return (self.words[frame // WORD_BITS] >> (frame % WORD_BITS)) & 1 == 1
+
+    def allocate(self, count):
+        # Lowest-numbered free frames, claimed a word at a time
+        if count > self.free_count:
+            return None
+        frames = array('q')
+        words = self.words
+        index = first = self.first_free_word
+        while len(frames) < count:
+            word = words[index]
+            if word == FULL_WORD and count - len(frames) >= WORD_BITS:
+                # A whole free word is claimed at once
+                frames.extend(range(index * WORD_BITS, (index + 1) * WORD_BITS))
+                word = words[index] = 0
+            elif word:
+                base = index * WORD_BITS
+                while word and len(frames) < count:
+                    low_bit = word & -word
+                    frames.append(base + low_bit.bit_length() - 1)
+                    word ^= low_bit
+                words[index] = word
+            if not word:
+                index += 1
+        if self.run_index is not None:
+            self.run_index.update(words, first, min(index, len(words) - 1))
+        self.first_free_word = index
+        self.free_count -= count
+        return frames
+
+    def get_run_index(self):
+        # Built the first time a caller asks about contiguous runs, then kept up to date on every change
+        if self.run_index is None:
+            self.run_index = RunIndex(self.words)
+        return self.run_index
+
+    def find_run(self, count):
+        # Start of the lowest run of count consecutive free frames, or None
+        if count > self.free_count or count <= 0:
+            return None
+        return self.get_run_index().find(self.words, count)
+
+    def longest_run(self):
+        return self.get_run_index().longest_run()
+
+    def allocate_run(self, count):
+        start = self.find_run(count)
+        if start is None:
+            return None
+        self.set_range(start, count, False)
+        self.free_count -= count
+        # Step past the words the run filled, as allocate does
+        words = self.words
+        index = self.first_free_word
+        while index < len(words) and not words[index]:
+            index += 1
+        self.first_free_word = index
+        return array('q', range(start, start + count))
+
+    def set_range(self, start, count, free):
+        end = start + count
+        first = start
+        while start < end:
+            index, offset = divmod(start, WORD_BITS)
+            span = min(WORD_BITS - offset, end - start)
+            mask = ((1 << span) - 1) << offset
+            if free:
+                self.words[index] |= mask
+            else:
+                self.words[index] &= ~mask & FULL_WORD
+            start += span
+        if self.run_index is not None and count > 0:
+            self.run_index.update(self.words, first // WORD_BITS, (end - 1) // WORD_BITS)
+
+    def release(self, frames):
+        if not frames:
+            return
+        words = self.words
+        lowest = min(frames)
+        if len(frames) > WORD_BITS and max(frames) - lowest == len(frames) - 1:
+            # Distinct frames spanning exactly their count form one run
+            self.set_range(lowest, len(frames), True)
+        else:
+            for frame in frames:
+                words[frame // WORD_BITS] |= 1 << (frame % WORD_BITS)
+            if self.run_index is not None:
+                for index in {frame // WORD_BITS for frame in frames}:
+                    self.run_index.update(words, index, index)
+        self.first_free_word = min(self.first_free_word, lowest // WORD_BITS)
+        self.free_count += len(frames)
+
+class PageTable:
+    # Multi-level table: interior levels are sparse dicts, leaves are arrays of frame numbers
+    def __init__(self, num_pages, levels=2):
+        if levels < 1:
+            raise ValueError("A page table needs at least one level.")
+        self.levels = levels
+        vpn_bits = max(num_pages - 1, 1).bit_length()
+        self.level_bits = -(-vpn_bits // levels)
+        self.index_mask = (1 << self.level_bits) - 1
+        self.root = {}
+        self.table_count = 1
+
+    def indexes(self, vpn):
+        for level in range(self.levels - 1, -1, -1):
+            yield (vpn >> (level * self.level_bits)) & self.index_mask
+
+    def map(self, vpn, frame):
+        *path, leaf_index = self.indexes(vpn)
+        table = self.root
+        for depth, index in enumerate(path):
+            if index not in table:
+                if depth == len(path) - 1:
+                    table[index] = array('q', [-1]) * (1 << self.level_bits)
+                else:
+                    table[index] = {}
+                self.table_count += 1
+            table = table[index]
+        table[leaf_index] = frame
+
+    def lookup(self, vpn):
+        *path, leaf_index = self.indexes(vpn)
+        table = self.root
+        for index in path:
+            table = table.get(index)
+            if table is None:
+                return None
+        frame = table.get(leaf_index) if isinstance(table, dict) else table[leaf_index]
+        return None if frame is None or frame < 0 else frame
+
+class TLB:
+    def __init__(self, size, policy="LRU"):
+        if policy not in ("LRU", "CLOCK"):
+            raise ValueError(f"Unknown TLB replacement policy: {policy}")
+        self.size = size
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+        # CLOCK keeps entries in fixed slots with a reference bit each
+        self.slots = [None] * size
+        self.referenced = bytearray(size)
+        self.hand = 0
+
+    def lookup(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.policy == "LRU":
+            self.entries.move_to_end(key)
+            return entry
+        self.referenced[entry[1]] = 1
+        return entry[0]
+
+    def insert(self, key, frame):
+        if self.size <= 0:
+            return
+        if self.policy == "LRU":
+            self.entries[key] = frame
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+            return
+        if key in self.entries:
+            slot = self.entries[key][1]
+        else:
+            # Sweep the hand past referenced slots, clearing their bits
+            while self.slots[self.hand] is not None and self.referenced[self.hand]:
+                self.referenced[self.hand] = 0
+                self.hand = (self.hand + 1) % self.size
+            slot = self.hand
+            if self.slots[slot] is not None:
+                del self.entries[self.slots[slot]]
+            self.slots[slot] = key
+            self.hand = (self.hand + 1) % self.size
+        self.entries[key] = (frame, slot)
+        self.referenced[slot] = 1
+
+    def invalidate(self, pid, vpn=None):
+        if vpn is not None:
+            keys = [(pid, vpn)] if (pid, vpn) in self.entries else []
+        else:
+            keys = [key for key in self.entries if key[0] == pid]
+        for key in keys:
+            entry = self.entries.pop(key)
+            if self.policy == "CLOCK":
+                self.slots[entry[1]] = None
+                self.referenced[entry[1]] = 0
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+class FIFOPolicy:
+    def __init__(self):
+        self.queue = OrderedDict()
+
+    def touch(self, page):
+        pass
+
+    def insert(self, page, frame):
+        self.queue[page] = frame
+
+    def evict(self):
+        return self.queue.popitem(last=False)[0]
+
+    def remove(self, page):
+        self.queue.pop(page, None)
+
+class LRUPolicy:
+    def __init__(self):
+        self.recency = OrderedDict()
+
+    def touch(self, page):
+        self.recency.move_to_end(page)
+
+    def insert(self, page, frame):
+        self.recency[page] = frame
+
+    def evict(self):
+        return self.recency.popitem(last=False)[0]
+
+    def remove(self, page):
+        self.recency.pop(page, None)
+
+class ClockPolicy:
+    # Second chance: frames form the clock face, each with a reference bit
+    def __init__(self, num_frames):
+        self.slots = [None] * num_frames
+        self.referenced = bytearray(num_frames)
+        self.frame_of = {}
+        self.hand = 0
+
+    def touch(self, page):
+        self.referenced[self.frame_of[page]] = 1
+
+    def insert(self, page, frame):
+        self.slots[frame] = page
+        self.frame_of[page] = frame
+        self.referenced[frame] = 1
+
+    def evict(self):
+        slots, referenced = self.slots, self.referenced
+        while slots[self.hand] is None or referenced[self.hand]:
+            referenced[self.hand] = 0
+            self.hand = (self.hand + 1) % len(slots)
+        page = slots[self.hand]
+        self.remove(page)
+        self.hand = (self.hand + 1) % len(slots)
+        return page
+
+    def remove(self, page):
+        frame = self.frame_of.pop(page, None)
+        if frame is not None:
+            self.slots[frame] = None
+            self.referenced[frame] = 0
+
+class OptimalPolicy:
+    # Belady: evict the resident page whose next use lies furthest in the future
+    def __init__(self, references):
+        references = list(references)
+        count = len(references)
+        self.next_use = [0] * count
+        last_use = {}
+        for position in range(count - 1, -1, -1):
+            page = references[position]
+            # Pages never used again get distinct positions past the end so ties cannot occur
+            self.next_use[position] = last_use.get(page, count + position)
+            last_use[page] = position
+        self.position = 0
+        self.scheduled = {}
+        self.heap = []
+
+    def touch(self, page):
+        if self.position >= len(self.next_use):
+            raise ValueError("Optimal replacement ran past the end of its reference string.")
+        next_use = self.next_use[self.position]
+        self.position += 1
+        self.scheduled[page] = next_use
+        heapq.heappush(self.heap, (-next_use, page))
+        if len(self.heap) > 4 * len(self.scheduled) + 64:
+            # Drop stale heap entries
+            self.heap = [(-next_use, page) for page, next_use in self.scheduled.items()]
+            heapq.heapify(self.heap)
+
+    def insert(self, page, frame):
+        self.touch(page)
+
+    def evict(self):
+        while True:
+            next_use, page = heapq.heappop(self.heap)
+            if self.scheduled.get(page) == -next_use:
+                del self.scheduled[page]
+                return page
+
+    def remove(self, page):
+        self.scheduled.pop(page, None)
+
+REPLACEMENT_POLICIES = ["FIFO", "LRU", "CLOCK", "Optimal"]
+
+def make_replacement_policy(policy, num_frames, references=None):
+    if policy == "FIFO":
+        return FIFOPolicy()
+    elif policy == "LRU":
+        return LRUPolicy()
+    elif policy == "CLOCK":
+        return ClockPolicy(num_frames)
+    elif policy == "Optimal":
+        if references is None:
+            raise ValueError("Optimal replacement needs the full reference string in advance.")
+        return OptimalPolicy(references)
+    raise ValueError(f"Unknown page replacement policy: {policy}")
+
+class DemandPager:
+    def __init__(self, num_frames, policy="LRU", references=None, working_set_window=1000):
+        if num_frames <= 0:
+            raise ValueError("Demand paging needs at least one frame.")
+        self.num_frames = num_frames
+        self.policy = make_replacement_policy(policy, num_frames, references)
+        self.resident = {}
+        self.free_frames = list(range(num_frames - 1, -1, -1))
+        self.references = 0
+        self.faults = 0
+        # Working set: distinct pages among the last working_set_window references
+        self.working_set_window = working_set_window
+        self.window = deque()
+        self.window_counts = {}
+        self.working_set_total = 0
+        self.peak_working_set = 0
+
+    def access(self, page):
+        # Returns the page's frame, whether it faulted, and the page evicted to make room
+        self.references += 1
+        self.track_working_set(page)
+        frame = self.resident.get(page)
+        if frame is not None:
+            self.policy.touch(page)
+            return frame, False, None
+        self.faults += 1
+        evicted = None
+        if self.free_frames:
+            frame = self.free_frames.pop()
+        else:
+            evicted = self.policy.evict()
+            frame = self.resident.pop(evicted)
+        self.resident[page] = frame
+        self.policy.insert(page, frame)
+        return frame, True, evicted
+
+    def track_working_set(self, page):
+        window, counts = self.window, self.window_counts
+        window.append(page)
+        counts[page] = counts.get(page, 0) + 1
+        if len(window) > self.working_set_window:
+            old_page = window.popleft()
+            if counts[old_page] == 1:
+                del counts[old_page]
+            else:
+                counts[old_page] -= 1
+        self.working_set_total += len(counts)
+        if len(counts) > self.peak_working_set:
+            self.peak_working_set = len(counts)
+
+    def release(self, page):
+        frame = self.resident.pop(page, None)
+        if frame is not None:
+            self.policy.remove(page)
+            self.free_frames.append(frame)
+
+    def stats(self):
+        return {
+            "references": self.references,
+            "page_faults": self.faults,
+            "fault_rate": self.faults / self.references if self.references else 0.0,
+            "resident_pages": len(self.resident),
+            "working_set_size": len(self.window_counts),
+            "average_working_set_size": self.working_set_total / self.references if self.references else 0.0,
+            "peak_working_set_size": self.peak_working_set,
+        }
+
+def read_references(path):
+    # Tokens separated by whitespace or commas; each is a page number or pid:page
+    with open(path) as reference_file:
+        for line in reference_file:
+            for token in line.replace(",", " ").split():
+                if ":" in token:
+                    pid, page = token.split(":")
+                    yield int(pid), int(page)
+                else:
+                    yield int(token)
+
+def replay_references(references, num_frames, policy="LRU", working_set_window=1000):
+    if isinstance(references, str):
+        references = read_references(references)
+    if policy == "Optimal":
+        references = list(references)
+    pager = DemandPager(num_frames, policy, references if policy == "Optimal" else None, working_set_window)
+    access = pager.access
+    for page in references:
+        access(page)
+    return pager.stats()
@@ -0,0 +1,257 @@
+import gc
+import json
+import mmap
+from array import array
+import numpy as np
+from MemoryEngine import (Process, MemoryBlock, FreeBlockIndex, TLSFIndex, PartitionedMemory, DynamicMemory,
+                          BuddyMemory, PagingMemory, SlabMemory, MemorySimulator)
+
+# File layout: MAGIC, the header length as a little-endian uint64, a JSON header, then every column as raw
+# little-endian integers, each starting on an 8-byte boundary. Columns are read straight out of a memory map.
+MAGIC = b"MEMSNAP\x01"
+ALIGNMENT = 8
+PAGING_OPTIONS = ["page_size", "contiguous", "page_table_levels", "virtual_address_bits", "tlb_latency",
+                  "memory_latency"]
+
+def aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def pack(values, dtype=None):
+    # Narrowest of int32/int64 that holds every value, unless the caller fixes the type
+    values = np.asarray(values, dtype or np.int64)
+    if dtype is None and (not len(values) or (values.min() >= -2 ** 31 and values.max() < 2 ** 31)):
+        values = values.astype(np.int32)
+    return values.astype(values.dtype.newbyteorder("<"), copy=False)
+
+def frame_table_state(frame_table, prefix):
+    columns = {f"{prefix}_words": pack(frame_table.words, np.uint64)}
+    metadata = {f"{prefix}_free_count": frame_table.free_count, f"{prefix}_first_free_word": frame_table.first_free_word}
+    return columns, metadata
+
+def restore_frame_table(frame_table, columns, metadata, prefix):
+    frame_table.words = array('Q', columns[f"{prefix}_words"].astype(np.uint64, copy=False).tobytes())
+    frame_table.free_count = metadata[f"{prefix}_free_count"]
+    frame_table.first_free_word = metadata[f"{prefix}_first_free_word"]
+    # Rebuilt from the restored words when next needed
+    frame_table.run_index = None
+
+def restore_tlsf_index(starts, blocks):
+    # Re-adding holes in saved order rebuilds every bin in the same order
+    tlsf_index = TLSFIndex()
+    for start in starts.tolist():
+        tlsf_index.add(start, blocks[start].size)
+    return tlsf_index
+
+def engine_state(engine):
+    # Columns and scalar metadata that fully describe an engine's placement state
+    if isinstance(engine, (PartitionedMemory, DynamicMemory)):
+        columns = {f"block_{name}": pack(values) for name, values in engine.block_columns().items()}
+        if engine.tlsf_index is not None:
+            # Holes in the order each TLSF bin hands them out, so TLSF placement continues unchanged
+            columns["tlsf_start"] = pack([start for holes in engine.tlsf_index.bins.values() for start in holes])
+        if isinstance(engine, PartitionedMemory):
+            return columns, {"next_fit_index": engine.next_fit_index}
+        return columns, {"copy_bandwidth": engine.copy_bandwidth, "next_fit_start": engine.next_fit_start,
+                         "compaction_bytes_moved": engine.compaction_bytes_moved, "splits": engine.splits,
+                         "merges": engine.merges}
+    if isinstance(engine, BuddyMemory):
+        # Free lists in list order, so blocks are handed out as before
+        free_blocks = [(start, order) for order, free_list in enumerate(engine.free_lists) for start in free_list]
+        allocated = list(engine.allocated.items())
+        columns = {
+            "free_start": pack([start for start, order in free_blocks]),
+            "free_order": pack([order for start, order in free_blocks]),
+            "allocated_pid": pack([pid for pid, placement in allocated]),
+            "allocated_start": pack([placement[0] for pid, placement in allocated]),
+            "allocated_order": pack([placement[1] for pid, placement in allocated]),
+        }
+        return columns, {"splits": engine.splits, "merges": engine.merges}
+    if isinstance(engine, PagingMemory):
+        if engine.pager is not None:
+            raise ValueError("Demand-paged memory cannot be snapshotted.")
+        columns, metadata = frame_table_state(engine.frames, "frame")
+        page_table = list(engine.page_table.items())
+        columns["page_table_pid"] = pack([pid for pid, frames in page_table])
+        columns["page_table_count"] = pack([len(frames) for pid, frames in page_table])
+        columns["page_table_frames"] = pack(np.concatenate([np.frombuffer(frames, np.int64) for pid, frames in page_table])
+                                            if page_table else [])
+        metadata.update({option: getattr(engine, option) for option in PAGING_OPTIONS})
+        metadata["tlb_size"] = engine.tlb.size
+        metadata["tlb_policy"] = engine.tlb.policy
+        metadata["translations"] = engine.translations
+        metadata["translation_time"] = engine.translation_time
+        return columns, metadata
+    if isinstance(engine, SlabMemory):
+        columns, metadata = frame_table_state(engine.slabs, "slab")
+        slabs = list(engine.slab_class.items())
+        objects = list(engine.objects.items())
+        large = list(engine.large_objects.items())
+        columns.update({
+            "slab_index": pack([slab for slab, size_class in slabs]),
+            "slab_class": pack([size_class for slab, size_class in slabs]),
+            # Each slab's free stack, in stack order, so objects are handed out as before
+            "slab_free_count": pack([len(engine.slab_free[slab]) for slab, size_class in slabs]),
+            "slab_free": pack([index for slab, size_class in slabs for index in engine.slab_free[slab]]),
+            # Partial slabs of every class in the order they are filled
+            "partial_slab": pack([slab for partial in engine.partial_slabs for slab in partial]),
+            "object_pid": pack([pid for pid, location in objects]),
+            "object_slab": pack([location[0] for pid, location in objects]),
+            "object_index": pack([location[1] for pid, location in objects]),
+            "large_pid": pack([pid for pid, placement in large]),
+            "large_first": pack([placement[0] for pid, placement in large]),
+            "large_count": pack([placement[1] for pid, placement in large]),
+        })
+        metadata.update({"size_classes": engine.size_classes, "slab_size": engine.slab_size,
+                         "reclaim_empty": engine.reclaim_empty, "slabs_created": engine.slabs_created,
+                         "slabs_reclaimed": engine.slabs_reclaimed})
+        return columns, metadata
+    raise ValueError(f"Cannot snapshot a {type(engine).__name__}.")
+
+def save_snapshot(simulator, path):
+    columns, metadata = engine_state(simulator.engine)
+    processes = list(simulator.processes.values())
+    columns["process_pid"] = pack([process.pid for process in processes])
+    columns["process_size"] = pack([process.size for process in processes])
+    header = {"technique": simulator.technique, "strategy": simulator.strategy,
+              "total_memory": simulator.total_memory, "process_id_counter": simulator.process_id_counter,
+              "engine": metadata, "columns": {}}
+    offset = 0
+    for name, values in columns.items():
+        header["columns"][name] = {"dtype": values.dtype.str, "length": len(values), "offset": offset}
+        offset = aligned(offset + values.nbytes)
+    header_bytes = json.dumps(header).encode()
+    with open(path, "wb") as snapshot_file:
+        snapshot_file.write(MAGIC + len(header_bytes).to_bytes(8, "little") + header_bytes)
+        position = len(MAGIC) + 8 + len(header_bytes)
+        for name, values in columns.items():
+            start = aligned(position)
+            snapshot_file.write(bytes(start - position) + values.tobytes())
+            position = start + values.nbytes
+    return path
+
+def read_snapshot(path):
+    # Header and columns of a snapshot; the columns are views into a read-only memory map
+    with open(path, "rb") as snapshot_file:
+        mapped = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a memory snapshot.")
+    header_length = int.from_bytes(mapped[len(MAGIC):len(MAGIC) + 8], "little")
+    header_end = len(MAGIC) + 8 + header_length
+    header = json.loads(mapped[len(MAGIC) + 8:header_end])
+    data_start = aligned(header_end)
+    columns = {name: np.frombuffer(mapped, spec["dtype"], spec["length"], data_start + spec["offset"])
+               for name, spec in header["columns"].items()}
+    return header, columns
+
+def restore_engine(technique, total_memory, columns, metadata, processes):
+    if technique in ("Fixed-sized Partitioning", "Unequal-sized Partitioning"):
+        engine = PartitionedMemory(columns["block_size"].tolist(), total_memory)
+        for block, pid in zip(engine.memory_blocks, columns["block_pid"].tolist()):
+            if pid >= 0:
+                engine.place_process(block, processes[pid])
+        if "tlsf_start" in columns:
+            engine.tlsf_index = restore_tlsf_index(columns["tlsf_start"], engine.blocks)
+        engine.next_fit_index = metadata["next_fit_index"]
+        return engine
+    if technique == "Dynamic Allocation":
+        engine = DynamicMemory(total_memory, metadata["copy_bandwidth"])
+        starts, sizes, pids = columns["block_start"], columns["block_size"], columns["block_pid"]
+        used = pids >= 0
+        engine.blocks = dict(zip(starts.tolist(), map(MemoryBlock, starts.tolist(), sizes.tolist())))
+        engine.process_blocks = dict(zip(pids[used].tolist(), starts[used].tolist()))
+        for pid, start in engine.process_blocks.items():
+            block = engine.blocks[start]
+            block.free = False
+            block.process = processes[pid]
+        engine.used_memory = int(sizes[used].sum())
+        holes = list(zip(starts[~used].tolist(), sizes[~used].tolist()))
+        engine.free_index = FreeBlockIndex.from_holes(holes)
+        engine.free_sizes = sorted((size, start) for start, size in holes)
+        engine.free_memory = total_memory - engine.used_memory
+        if "tlsf_start" in columns:
+            engine.tlsf_index = restore_tlsf_index(columns["tlsf_start"], engine.blocks)
+        for name in ("next_fit_start", "compaction_bytes_moved", "splits", "merges"):
+            setattr(engine, name, metadata[name])
+        return engine
+    if technique == "Buddy System":
+        engine = BuddyMemory(total_memory)
+        engine.free_lists = [{} for _ in range(engine.max_order + 1)]
+        for start, order in zip(columns["free_start"].tolist(), columns["free_order"].tolist()):
+            engine.free_lists[order][start] = None
+        engine.free_block_count = len(columns["free_start"])
+        for pid, start, order in zip(columns["allocated_pid"].tolist(), columns["allocated_start"].tolist(),
+                                     columns["allocated_order"].tolist()):
+            engine.allocated[pid] = (start, order)
+            engine.processes[start] = processes[pid]
+            engine.allocated_memory += 1 << order
+            engine.used_memory += processes[pid].size
+        engine.splits, engine.merges = metadata["splits"], metadata["merges"]
+        return engine
+    if technique == "Paging":
+        # The TLB is restored empty
+        options = {option: metadata[option] for option in PAGING_OPTIONS + ["tlb_size", "tlb_policy"]}
+        engine = PagingMemory(total_memory, **options)
+        restore_frame_table(engine.frames, columns, metadata, "frame")
+        frames = columns["page_table_frames"].astype(np.int64, copy=False)
+        offset = 0
+        for pid, count in zip(columns["page_table_pid"].tolist(), columns["page_table_count"].tolist()):
+            engine.register_process(processes[pid], array('q', frames[offset:offset + count].tobytes()))
+            offset += count
+        engine.translations = metadata["translations"]
+        engine.translation_time = metadata["translation_time"]
+        return engine
+    if technique == "Slab Allocation":
+        engine = SlabMemory(total_memory, metadata["size_classes"], metadata["slab_size"], metadata["reclaim_empty"])
+        restore_frame_table(engine.slabs, columns, metadata, "slab")
+        free_stacks = columns["slab_free"].tolist()
+        offset = 0
+        for slab, size_class, free_count in zip(columns["slab_index"].tolist(), columns["slab_class"].tolist(),
+                                                columns["slab_free_count"].tolist()):
+            count = engine.objects_per_slab[size_class]
+            object_size = engine.size_classes[size_class]
+            engine.slab_class[slab] = size_class
+            engine.slab_free[slab] = free_stacks[offset:offset + free_count]
+            engine.slab_objects[slab] = [None] * count
+            offset += free_count
+            engine.class_slabs[size_class] += 1
+            engine.class_free_objects[size_class] += free_count
+            engine.free_object_count += free_count
+            engine.free_object_memory += free_count * object_size
+            engine.internal_fragmentation += engine.slab_size - count * object_size
+        for slab in columns["partial_slab"].tolist():
+            engine.partial_slabs[engine.slab_class[slab]][slab] = None
+        for pid, slab, index in zip(columns["object_pid"].tolist(), columns["object_slab"].tolist(),
+                                    columns["object_index"].tolist()):
+            process = processes[pid]
+            engine.slab_objects[slab][index] = process
+            engine.objects[pid] = (slab, index)
+            engine.used_memory += process.size
+            engine.internal_fragmentation += engine.size_classes[engine.slab_class[slab]] - process.size
+        for pid, first, count in zip(columns["large_pid"].tolist(), columns["large_first"].tolist(),
+                                     columns["large_count"].tolist()):
+            process = processes[pid]
+            engine.large_objects[pid] = (first, count, process)
+            engine.used_memory += process.size
+            engine.internal_fragmentation += count * engine.slab_size - process.size
+        engine.slabs_created = metadata["slabs_created"]
+        engine.slabs_reclaimed = metadata["slabs_reclaimed"]
+        return engine
+    raise ValueError(f"Unknown memory management technique: {technique}")
+
+def load_snapshot(path):
+    # Rebuilds a simulator from its placement columns without replaying any events
+    header, columns = read_snapshot(path)
+    # Millions of fresh objects would otherwise trigger repeated, fruitless cycle collections
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        pids = columns["process_pid"].tolist()
+        processes = dict(zip(pids, map(Process, pids, columns["process_size"].tolist())))
+        engine = restore_engine(header["technique"], header["total_memory"], columns, header["engine"], processes)
+    finally:
+        if collecting:
+            gc.enable()
+    simulator = MemorySimulator(header["technique"], header["total_memory"], header["strategy"], engine=engine)
+    simulator.processes = processes
+    simulator.process_id_counter = header["process_id_counter"]
+    return simulator
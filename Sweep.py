@@ -0,0 +1,100 @@
+import argparse
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from MemoryEngine import TECHNIQUES, STRATEGIES, STRATEGY_TECHNIQUES, MemorySimulator
+from Workload import SIZE_DISTRIBUTIONS, generate_workload, replay
+from Snapshot import load_snapshot, read_snapshot
+
+CELL_FIELDS = ["technique", "strategy", "total_memory", "page_size", "seed"]
+RESULT_FIELDS = CELL_FIELDS + ["events", "allocations", "failed_allocations", "success_rate", "frees",
+                               "external_fragmentation", "internal_fragmentation", "free_memory", "largest_free_block",
+                               "free_block_count", "external_fragmentation_index", "elapsed", "ops_per_second"]
+
+def sweep_cells(techniques, strategies, memory_sizes, page_sizes, seeds):
+    # Strategy and page size only vary where they change the outcome
+    cells = []
+    for technique, memory, seed in itertools.product(techniques, memory_sizes, seeds):
+        technique_strategies = strategies if technique in STRATEGY_TECHNIQUES else [""]
+        technique_page_sizes = page_sizes if technique == "Paging" else [""]
+        for strategy, page_size in itertools.product(technique_strategies, technique_page_sizes):
+            cells.append({"technique": technique, "strategy": strategy, "total_memory": memory,
+                          "page_size": page_size, "seed": seed})
+    return cells
+
+def cell_key(cell):
+    return tuple(str(cell[field]) for field in CELL_FIELDS)
+
+def run_cell(cell, workload_options, snapshot=None):
+    if snapshot is not None:
+        # Branch from a shared warmed-up heap; generated pids start after the ones already in it
+        simulator = load_snapshot(snapshot)
+        simulator.strategy = cell["strategy"] or simulator.strategy
+    else:
+        options = {"page_size": cell["page_size"]} if cell["technique"] == "Paging" else {}
+        simulator = MemorySimulator(cell["technique"], cell["total_memory"], cell["strategy"] or "First Fit",
+                                    cell["seed"], **options)
+    workload = generate_workload(seed=cell["seed"], **workload_options)
+    workload.pids += simulator.process_id_counter - 1
+    summary = replay(workload, simulator)
+    requests = summary["allocations"] + summary["failed_allocations"]
+    result = dict(cell)
+    for field in RESULT_FIELDS[len(CELL_FIELDS):]:
+        result[field] = summary.get(field)
+    result["success_rate"] = summary["allocations"] / requests if requests else 1.0
+    result["ops_per_second"] = summary["events_per_second"]
+    return result
+
+def completed_cells(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, newline="") as results_file:
+        return {cell_key(row) for row in csv.DictReader(results_file)}
+
+def run_sweep(path, cells, workload_options, max_workers=None, snapshot=None):
+    # Results are appended as they finish, so an interrupted sweep resumes where it stopped
+    done = completed_cells(path)
+    pending = [cell for cell in cells if cell_key(cell) not in done]
+    write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+    with open(path, "a", newline="") as results_file:
+        writer = csv.DictWriter(results_file, fieldnames=RESULT_FIELDS)
+        if write_header:
+            writer.writeheader()
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(run_cell, cell, workload_options, snapshot) for cell in pending]
+            for future in as_completed(futures):
+                writer.writerow(future.result())
+                results_file.flush()
+    return len(pending)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep techniques and strategies over synthetic workloads.")
+    parser.add_argument("results", help="CSV file the results are appended to")
+    parser.add_argument("--techniques", nargs="+", default=TECHNIQUES, choices=TECHNIQUES)
+    parser.add_argument("--strategies", nargs="+", default=STRATEGIES, choices=STRATEGIES)
+    parser.add_argument("--memory", nargs="+", type=int, help="total memory sizes")
+    parser.add_argument("--page-sizes", nargs="+", type=int, default=[100])
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0])
+    parser.add_argument("--allocations", type=int, default=100000)
+    parser.add_argument("--size-distribution", default="uniform", choices=SIZE_DISTRIBUTIONS)
+    parser.add_argument("--max-size", type=int, default=1000)
+    parser.add_argument("--mean-lifetime", type=float, default=100)
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--snapshot", help="start every cell from this saved heap; fixes technique and memory")
+    args = parser.parse_args(argv)
+
+    if args.snapshot:
+        header = read_snapshot(args.snapshot)[0]
+        args.techniques, args.memory = [header["technique"]], [header["total_memory"]]
+        args.page_sizes = [header["engine"].get("page_size", "")]
+    elif args.memory is None:
+        parser.error("--memory is required unless --snapshot is given")
+    cells = sweep_cells(args.techniques, args.strategies, args.memory, args.page_sizes, args.seeds)
+    workload_options = {"allocations": args.allocations, "size_distribution": args.size_distribution,
+                        "max_size": args.max_size, "mean_lifetime": args.mean_lifetime}
+    ran = run_sweep(args.results, cells, workload_options, args.workers, args.snapshot)
+    print(f"Ran {ran} of {len(cells)} grid cells; results in {args.results}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import argparse
+import csv
+import gzip
+import json
+import sys
+import time
+import numpy as np
+from MemoryEngine import TECHNIQUES, STRATEGIES, MemorySimulator
+from Instrumentation import Instrumentation
+from Snapshot import load_snapshot, save_snapshot
+
+# Events are plain tuples: ("alloc", pid, size), ("free", pid) or ("compact",)
+EVENT_NAMES = ("alloc", "free", "compact")
+
+def open_trace(path):
+    with open(path, "rb") as trace_file:
+        compressed = trace_file.read(2) == b"\x1f\x8b"
+    if compressed:
+        return gzip.open(path, "rt", newline="")
+    return open(path, newline="")
+
+def trace_format(path):
+    name = path[:-3] if path.endswith(".gz") else path
+    if name.endswith(".jsonl") or name.endswith(".json"):
+        return "jsonl"
+    return "csv"
+
+def parse_event(name, pid=None, size=None):
+    if name == "alloc":
+        return ("alloc", int(pid), int(size))
+    elif name == "free":
+        return ("free", int(pid))
+    elif name == "compact":
+        return ("compact",)
+    raise ValueError(f"Unknown trace event: {name}")
+
+def read_csv_trace(lines):
+    first_row = True
+    for row in csv.reader(lines):
+        # Skip blank lines, comments and a header row; any other unknown event is an error
+        if not row or row[0].startswith("#"):
+            continue
+        if first_row and row[0].strip() not in EVENT_NAMES:
+            first_row = False
+            continue
+        first_row = False
+        yield parse_event(*(field.strip() for field in row if field.strip()))
+
+def read_jsonl_trace(lines):
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        yield parse_event(record["event"], record.get("pid"), record.get("size"))
+
+def read_trace(path, format=None):
+    # Lazily yields events, so traces larger than memory can be replayed
+    with open_trace(path) as lines:
+        if (format or trace_format(path)) == "jsonl":
+            yield from read_jsonl_trace(lines)
+        else:
+            yield from read_csv_trace(lines)
+
+def write_trace(path, events):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", newline="") as trace_file:
+        if trace_format(path) == "jsonl":
+            for event in events:
+                record = {"event": event[0]}
+                if len(event) > 1:
+                    record["pid"] = event[1]
+                if len(event) > 2:
+                    record["size"] = event[2]
+                trace_file.write(json.dumps(record) + "\n")
+        else:
+            csv.writer(trace_file).writerows(events)
+
+def replay(events, simulator, checkpoint_every=0, on_checkpoint=None):
+    summary = {"events": 0, "allocations": 0, "failed_allocations": 0, "empty_allocations": 0, "frees": 0,
+               "compactions": 0}
+    started = time.perf_counter()
+    add_process, remove_process = simulator.add_process, simulator.remove_process
+    processes = simulator.processes
+
+    def checkpoint():
+        elapsed = time.perf_counter() - started
+        summary["elapsed"] = elapsed
+        summary["events_per_second"] = summary["events"] / elapsed if elapsed else 0.0
+        summary.update(simulator.stats())
+        return dict(summary)
+
+    for event in events:
+        name = event[0]
+        if name == "alloc":
+            if event[2] <= 0:
+                # malloc(0) and the like: nothing to place, so count it as failed rather than abort the replay
+                summary["empty_allocations"] += 1
+                summary["failed_allocations"] += 1
+            elif event[1] not in processes and add_process(event[2], pid=event[1]) is not None:
+                summary["allocations"] += 1
+            else:
+                summary["failed_allocations"] += 1
+        elif name == "free":
+            if remove_process(event[1]):
+                summary["frees"] += 1
+        else:
+            if simulator.compact():
+                summary["compactions"] += 1
+        summary["events"] += 1
+        if checkpoint_every and summary["events"] % checkpoint_every == 0 and on_checkpoint is not None:
+            on_checkpoint(checkpoint())
+    return checkpoint()
+
+SIZE_DISTRIBUTIONS = ["uniform", "exponential", "lognormal", "bimodal", "zipf"]
+LIFETIME_DISTRIBUTIONS = ["exponential", "uniform", "lognormal"]
+
+def generate_sizes(rng, count, distribution="uniform", min_size=1, max_size=1000, mean_size=100, sigma=1.0,
+                   large_size=None, large_fraction=0.1, zipf_exponent=1.5):
+    if distribution == "uniform":
+        sizes = rng.integers(min_size, max_size, count, endpoint=True)
+    elif distribution == "exponential":
+        sizes = rng.exponential(mean_size, count)
+    elif distribution == "lognormal":
+        # Parametrised so the distribution's mean is mean_size
+        sizes = rng.lognormal(np.log(mean_size) - sigma ** 2 / 2, sigma, count)
+    elif distribution == "bimodal":
+        # Mostly small requests around mean_size with a fraction of large ones
+        large_size = large_size or max_size // 2
+        large = rng.random(count) < large_fraction
+        sizes = np.where(large, rng.normal(large_size, large_size / 10, count), rng.normal(mean_size, mean_size / 10, count))
+    elif distribution == "zipf":
+        sizes = min_size * rng.zipf(zipf_exponent, count)
+    else:
+        raise ValueError(f"Unknown size distribution: {distribution}")
+    return np.clip(np.rint(sizes), min_size, max_size).astype(np.int64)
+
+def generate_lifetimes(rng, count, distribution="exponential", mean_lifetime=100, sigma=1.0):
+    if distribution == "exponential":
+        lifetimes = rng.exponential(mean_lifetime, count)
+    elif distribution == "uniform":
+        lifetimes = rng.uniform(0, 2 * mean_lifetime, count)
+    elif distribution == "lognormal":
+        lifetimes = rng.lognormal(np.log(mean_lifetime) - sigma ** 2 / 2, sigma, count)
+    else:
+        raise ValueError(f"Unknown lifetime distribution: {distribution}")
+    # A process always outlives the tick it was allocated in
+    return np.maximum(lifetimes, 0.5)
+
+class GeneratedWorkload:
+    # Events as parallel arrays in time order; iterating yields replayable event tuples
+    def __init__(self, kinds, pids, sizes):
+        self.kinds = kinds
+        self.pids = pids
+        self.sizes = sizes
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __iter__(self):
+        chunk = 1 << 16
+        for begin in range(0, len(self.kinds), chunk):
+            kinds = self.kinds[begin:begin + chunk].tolist()
+            pids = self.pids[begin:begin + chunk].tolist()
+            sizes = self.sizes[begin:begin + chunk].tolist()
+            for kind, pid, size in zip(kinds, pids, sizes):
+                yield ("alloc", pid, size) if kind == 0 else ("free", pid)
+
+def generate_workload(allocations, seed=None, size_distribution="uniform", lifetime_distribution="exponential",
+                      mean_lifetime=100, drain=False, **size_options):
+    # One allocation per tick; each process is freed once its lifetime has elapsed
+    rng = np.random.default_rng(seed)
+    sizes = generate_sizes(rng, allocations, size_distribution, **size_options)
+    births = np.arange(allocations, dtype=np.float64)
+    deaths = births + generate_lifetimes(rng, allocations, lifetime_distribution, mean_lifetime)
+    pids = np.arange(1, allocations + 1, dtype=np.int64)
+    if not drain:
+        # Keep the steady state: drop frees that would fall after the last allocation
+        freed = deaths < allocations
+        deaths, free_pids = deaths[freed], pids[freed]
+    else:
+        free_pids = pids
+    times = np.concatenate([births, deaths])
+    order = np.argsort(times, kind="stable")
+    kinds = np.concatenate([np.zeros(allocations, np.int8), np.ones(len(free_pids), np.int8)])[order]
+    all_pids = np.concatenate([pids, free_pids])[order]
+    all_sizes = np.concatenate([sizes, np.zeros(len(free_pids), np.int64)])[order]
+    return GeneratedWorkload(kinds, all_pids, all_sizes)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay or generate allocation traces for the memory simulator.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    replay_parser = commands.add_parser("replay", help="replay a trace through the simulator")
+    replay_parser.add_argument("trace", help="CSV or JSONL trace, optionally gzip-compressed")
+    replay_parser.add_argument("--technique", default="Dynamic Allocation", choices=TECHNIQUES)
+    replay_parser.add_argument("--strategy", choices=STRATEGIES, help="default: First Fit, or the snapshot's")
+    replay_parser.add_argument("--memory", type=int, help="total memory size")
+    replay_parser.add_argument("--snapshot", help="start from a saved heap instead of empty memory")
+    replay_parser.add_argument("--save-snapshot", metavar="PATH", help="save the final heap")
+    replay_parser.add_argument("--page-size", type=int, default=100)
+    replay_parser.add_argument("--slab-size", type=int, default=4096)
+    replay_parser.add_argument("--size-classes", type=int, nargs="+", help="object sizes for slab allocation")
+    replay_parser.add_argument("--seed", type=int, help="seed for unequal-sized partitions")
+    replay_parser.add_argument("--checkpoint-every", type=int, default=0, help="print statistics every N events")
+    replay_parser.add_argument("--profile", metavar="PREFIX", help="time the allocator hot paths and write PREFIX_*.csv")
+    replay_parser.add_argument("--graph", metavar="PNG", help="save a memory map of the final state")
+
+    generate_parser = commands.add_parser("generate", help="write a synthetic trace")
+    generate_parser.add_argument("trace", help="output path; .jsonl and .gz suffixes are honoured")
+    generate_parser.add_argument("--allocations", type=int, required=True)
+    generate_parser.add_argument("--seed", type=int)
+    generate_parser.add_argument("--size-distribution", default="uniform", choices=SIZE_DISTRIBUTIONS)
+    generate_parser.add_argument("--lifetime-distribution", default="exponential", choices=LIFETIME_DISTRIBUTIONS)
+    generate_parser.add_argument("--min-size", type=int, default=1)
+    generate_parser.add_argument("--max-size", type=int, default=1000)
+    generate_parser.add_argument("--mean-size", type=float, default=100)
+    generate_parser.add_argument("--mean-lifetime", type=float, default=100)
+    generate_parser.add_argument("--drain", action="store_true", help="free every process by the end of the trace")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        workload = generate_workload(args.allocations, args.seed, args.size_distribution, args.lifetime_distribution,
+                                     args.mean_lifetime, args.drain, min_size=args.min_size, max_size=args.max_size,
+                                     mean_size=args.mean_size)
+        write_trace(args.trace, workload)
+        return
+
+    if args.snapshot:
+        # The snapshot fixes the technique and memory; only the strategy can be changed
+        simulator = load_snapshot(args.snapshot)
+        simulator.strategy = args.strategy or simulator.strategy
+    elif args.memory is None:
+        parser.error("--memory is required unless --snapshot is given")
+    else:
+        options = {"page_size": args.page_size} if args.technique == "Paging" else {}
+        if args.technique == "Slab Allocation":
+            options = {"slab_size": args.slab_size, "size_classes": args.size_classes}
+        simulator = MemorySimulator(args.technique, args.memory, args.strategy or "First Fit", args.seed, **options)
+    writer = None
+
+    def print_checkpoint(stats):
+        nonlocal writer
+        if writer is None:
+            writer = csv.DictWriter(sys.stdout, fieldnames=list(stats))
+            writer.writeheader()
+        writer.writerow(stats)
+
+    instrumentation = None
+    if args.profile:
+        instrumentation = Instrumentation(sample_every=args.checkpoint_every or 1000)
+        instrumentation.attach(simulator.engine)
+
+    print_checkpoint(replay(read_trace(args.trace), simulator, args.checkpoint_every, print_checkpoint))
+    if instrumentation is not None:
+        instrumentation.export_csv(args.profile)
+    if args.save_snapshot:
+        save_snapshot(simulator, args.save_snapshot)
+    if args.graph:
+        from MemoryGraph import save_memory_map
+        save_memory_map(simulator, args.graph)
+
+if __name__ == "__main__":
+    main()